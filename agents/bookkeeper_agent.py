@@ -1,17 +1,109 @@
+import cProfile
+import sys
+import threading
 from .base_agent import BaseAgent
+from storage.checkpoint import IngestCheckpoint
 from tasks.add_transaction_task import AddTransactionTask
+from tasks.categorize_transaction_task import CategorizeTransactionTask
+from tasks.generate_aging_reports import GenerateAgingReportsTask
+from tasks.generate_ap_aging_report import GenerateAPAgingReportTask
+from tasks.generate_ar_aging_report import GenerateARAgingReportTask
+from tasks.mark_transaction_paid_task import MarkTransactionPaidTask
+from tasks.process_entities_task import ProcessEntitiesTask
 from tasks.process_transactions_task import ProcessTransactionsTask
+from tasks.verify_summary_task import VerifySummaryTask
+from tasks.view_status_task import ViewStatusTask
+from tasks.watch_transactions_task import WatchTransactionsTask
+from utils.aging_engine import parse_boundaries
+from utils.categorization_cache import load_cache
+from utils.metrics import EXPORT_FORMATS, METRICS
+from utils.prompt_templates import parse_labels
+from utils.rule_engine import load_rules
+from utils.similarity_classifier import load_classifier
+from utils.storage_loader import load_storage
 
 class BookkeeperAgent(BaseAgent):
-    def __init__(self, model):
+    # Tasks that only read the ledger; callers may run these concurrently
+    READ_ONLY_TASKS = frozenset({"view_status", "ar_aging_report", "ap_aging_report", "aging_reports"})
+
+    def __init__(self, model, config, profile_path=None):
         self.model = model
+        self.metrics_path = config["METRICS_PATH"]
+        self.metrics_format = config["METRICS_FORMAT"]
+        if self.metrics_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported METRICS_FORMAT: {self.metrics_format}")
+        self.profile_path = profile_path
+        self._profile_lock = threading.Lock()
+        concurrency = config["CATEGORIZATION_CONCURRENCY"]
+        batch_size = config["CATEGORIZATION_BATCH_SIZE"]
+        self.cache = load_cache(config)
+        self.rules = load_rules(config["CATEGORY_RULES_PATH"])
+        labels = parse_labels(config["CATEGORY_LABELS"])
+        self.storage = load_storage(config)
+        self.classifier = load_classifier(config, self.storage)
+        aging_options = {
+            "storage": self.storage,
+            "boundaries": parse_boundaries(config["AGING_BUCKETS"]),
+            "top_n": config["AGING_TOP_N"],
+            "engine": config["ANALYTICS_ENGINE"],
+        }
         self.tasks = {
-            "add_transaction": AddTransactionTask(model),
-            "process_transactions": ProcessTransactionsTask(model),
+            "add_transaction": AddTransactionTask(model, storage=self.storage),
+            "process_transactions": ProcessTransactionsTask(
+                model, concurrency=concurrency, cache=self.cache, rules=self.rules,
+                batch_size=batch_size, storage=self.storage, chunk_size=config["INGEST_CHUNK_SIZE"],
+                checkpoint=IngestCheckpoint(config["INGEST_CHECKPOINT_PATH"]),
+                retry_rounds=config["RETRY_QUEUE_ROUNDS"], classifier=self.classifier, labels=labels
+            ),
+            "process_entities": ProcessEntitiesTask(
+                config, entities_path=config["ENTITIES_PATH"], workers=config["ENTITY_WORKERS"],
+                output_csv=config["CONSOLIDATED_SUMMARY_CSV"]
+            ),
+            "categorize_transactions": CategorizeTransactionTask(
+                model, concurrency=concurrency, cache=self.cache, batch_size=batch_size, labels=labels
+            ),
+            "view_status": ViewStatusTask(storage=self.storage, engine=config["ANALYTICS_ENGINE"]),
+            "ar_aging_report": GenerateARAgingReportTask(**aging_options),
+            "ap_aging_report": GenerateAPAgingReportTask(**aging_options),
+            "aging_reports": GenerateAgingReportsTask(**aging_options),
+            "mark_transaction_paid": MarkTransactionPaidTask(
+                storage=self.storage, date_window=config["SETTLEMENT_DATE_WINDOW"]
+            ),
+            "verify_summary": VerifySummaryTask(storage=self.storage),
         }
+        self.tasks["watch_transactions"] = WatchTransactionsTask(
+            self.tasks["process_transactions"], self.storage, state_path=config["WATCH_STATE_PATH"],
+            interval=config["WATCH_INTERVAL"], drop_dir=config["WATCH_DROP_DIR"]
+        )
 
     def run(self, task_name, *args, **kwargs):
         task = self.tasks.get(task_name)
         if not task:
             raise ValueError(f"Unknown task: {task_name}")
-        return task.execute(*args, **kwargs)
+        status = "error"
+        try:
+            with METRICS.span("task", task=task_name):
+                if self.profile_path:
+                    result = self._profile(task_name, task, *args, **kwargs)
+                else:
+                    result = task.execute(*args, **kwargs)
+            status = "ok"
+            return result
+        finally:
+            METRICS.inc("bookkeeper_task_runs_total", 1, "Task runs by outcome", task=task_name, status=status)
+            if self.metrics_path:
+                METRICS.export(self.metrics_path, self.metrics_format, task=task_name, status=status)
+
+    def _profile(self, task_name, task, *args, **kwargs):
+        # Only one profiler can be active at a time, so concurrent service requests take turns
+        path = self.profile_path.replace("{task}", task_name)
+        with self._profile_lock:
+            profiler = cProfile.Profile()
+            try:
+                return profiler.runcall(task.execute, *args, **kwargs)
+            finally:
+                profiler.dump_stats(path)
+                print(f"Profile of {task_name} written to {path} (inspect with: python -m pstats {path})", file=sys.stderr)
+
+    def is_read_only(self, task_name):
+        return task_name in self.READ_ONLY_TASKS
@@ -0,0 +1,54 @@
+import json
+import re
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+# Keyword answers line up with the synthetic vendors; anything else gets a stable hashed label
+KEYWORD_LABELS = [
+    ("stripe", "Revenue"),
+    ("invoice", "Subscription Revenue"),
+    ("consult", "Professional Services"),
+    ("contractor", "Professional Services"),
+    ("hosting", "Hosting Expenses"),
+    ("aws", "Hosting Expenses"),
+    ("rent", "Operating Expenses"),
+    ("software", "Operating Expenses"),
+]
+FALLBACK_LABELS = ["Office Expenses", "Travel Expenses", "Meals Expenses", "Marketing Expenses", "Bank Fees"]
+
+SINGLE_DESCRIPTION = re.compile(r"description: '(.*)'", re.IGNORECASE)
+BATCH_LINE = re.compile(r"^(\S+) \| (.*) \| (-?[\d.]+)$", re.MULTILINE)
+
+class FakeLLM:
+    # A deterministic stand-in for Ollama: same prompt, same answer, after a fixed simulated latency
+    model = "benchmark-fake-llm"
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt, **kwargs):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        batch = BATCH_LINE.findall(prompt)
+        if batch:
+            return json.dumps({item_id: self.label(description) for item_id, description, _ in batch})
+        match = SINGLE_DESCRIPTION.search(prompt)
+        return self.label(match.group(1) if match else prompt)
+
+    def batch(self, prompts, config=None, **kwargs):
+        max_concurrency = (config or {}).get("max_concurrency") or 1
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            return list(executor.map(self.invoke, prompts))
+
+    def label(self, description):
+        text = description.lower()
+        for keyword, label in KEYWORD_LABELS:
+            if keyword in text:
+                return label
+        return FALLBACK_LABELS[zlib.crc32(text.encode()) % len(FALLBACK_LABELS)]
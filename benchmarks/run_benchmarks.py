@@ -0,0 +1,238 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from statistics import median
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TASKS = ["process_transactions", "categorize_transactions", "ar_aging_report", "ap_aging_report", "mark_transaction_paid", "view_status"]
+# These rewrite the ledger, so every run gets a fresh copy of it
+MUTATING_TASKS = {"process_transactions", "categorize_transactions", "mark_transaction_paid"}
+
+# Histograms whose observations are per model request or per task phase; a few whole-task runs are
+# far too few samples for percentiles, so p50/p99 come from these instead
+LATENCY_HISTOGRAMS = ("bookkeeper_llm_call_seconds", "bookkeeper_span_seconds")
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def build_storage(backend, directory, task):
+    from storage.csv_storage import CsvLedgerStorage
+    raw_csv = os.path.join(directory, "transactions.csv")
+    processed_csv = os.path.join(directory, "processed_transactions.csv")
+    summary_csv = os.path.join(directory, "monthly_summary.csv")
+    if task == "process_transactions":
+        # Processing starts from an untouched raw ledger
+        for path in (processed_csv, summary_csv):
+            if os.path.exists(path):
+                os.remove(path)
+    if backend == "csv":
+        return CsvLedgerStorage(raw_csv, processed_csv, summary_csv)
+    if backend == "partitioned":
+        from storage.partitioned_storage import PartitionedLedgerStorage, partition_csv_ledger
+        partition_dir = os.path.join(directory, "processed")
+        if task == "process_transactions":
+            shutil.rmtree(partition_dir, ignore_errors=True)
+        storage = PartitionedLedgerStorage(raw_csv, partition_dir, summary_csv)
+        if task != "process_transactions" and not os.path.isdir(partition_dir):
+            partition_csv_ledger(storage, processed_csv)
+        return storage
+    from storage.import_csv import import_csv_ledger
+    from storage.sqlite_storage import SqliteLedgerStorage
+    storage = SqliteLedgerStorage(os.path.join(directory, "ledger.db"))
+    import_csv_ledger(storage, raw_csv, processed_csv)
+    return storage
+
+def run_task(task, directory, backend, latency, concurrency, batch_size, chunk_size, use_cache):
+    # Runs inside a fresh interpreter so peak RSS belongs to this task alone
+    from benchmarks.fake_llm import FakeLLM
+    from tasks.categorize_transaction_task import CategorizeTransactionTask
+    from tasks.generate_ap_aging_report import GenerateAPAgingReportTask
+    from tasks.generate_ar_aging_report import GenerateARAgingReportTask
+    from tasks.mark_transaction_paid_task import MarkTransactionPaidTask
+    from tasks.process_transactions_task import ProcessTransactionsTask
+    from tasks.view_status_task import ViewStatusTask
+    from utils.categorization_cache import CategorizationCache
+    from utils.rule_engine import DEFAULT_RULES, RuleEngine
+
+    from utils.metrics import METRICS
+
+    model = FakeLLM(latency)
+    # A cold cache per run: repeats within the ledger are served from it, earlier runs are not
+    cache = CategorizationCache(os.path.join(directory, "category_cache.json")) if use_cache else None
+    storage = build_storage(backend, directory, task)
+    arguments = {}
+    if task == "process_transactions":
+        rows = sum(1 for _ in storage.iter_transactions())
+        runner = ProcessTransactionsTask(model, storage=storage, rules=RuleEngine(DEFAULT_RULES), cache=cache,
+                                         concurrency=concurrency, batch_size=batch_size, chunk_size=chunk_size)
+    elif task == "categorize_transactions":
+        rows = sum(1 for _ in open(os.path.join(directory, "real_transactions.csv"))) - 1
+        runner = CategorizeTransactionTask(model, os.path.join(directory, "real_transactions.csv"),
+                                           concurrency=concurrency, cache=cache, batch_size=batch_size)
+    elif task == "mark_transaction_paid":
+        # Settle every tenth open item in one bulk pass
+        arguments["transaction_ids"] = [row['transaction_id'] for row in storage.iter_processed(payment_status="Unpaid")][::10]
+        arguments["interactive"] = False
+        rows = len(arguments["transaction_ids"])
+        runner = MarkTransactionPaidTask(storage=storage)
+    elif task == "view_status":
+        # The status view reads only the stored monthly summary, so its throughput is per summary row
+        rows = len(storage.load_summary())
+        runner = ViewStatusTask(storage=storage)
+    else:
+        rows = sum(1 for _ in storage.iter_processed())
+        runner = {
+            "ar_aging_report": GenerateARAgingReportTask,
+            "ap_aging_report": GenerateAPAgingReportTask,
+        }[task](storage=storage)
+
+    METRICS.reset()
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        start = time.perf_counter()
+        runner.execute(**arguments)
+        elapsed = time.perf_counter() - start
+    storage.close()
+    return {"elapsed": elapsed, "rows": rows, "peak_rss_mb": peak_rss_mb(), "llm_calls": model.calls, "latency": latency_report(METRICS)}
+
+def latency_report(metrics):
+    # p50/p99 per model request mode and per task phase; values are histogram bucket upper bounds
+    report = {}
+    for histogram in metrics.to_record()["histograms"]:
+        if histogram["name"] not in LATENCY_HISTOGRAMS:
+            continue
+        labels = histogram["labels"]
+        name = f"llm_{labels.get('mode', 'call')}" if histogram["name"] == "bookkeeper_llm_call_seconds" else labels.get("span", "span")
+        report[name] = {"count": histogram["count"], "p50_ms": round(histogram["p50"] * 1000, 2), "p99_ms": round(histogram["p99"] * 1000, 2)}
+    return report
+
+def spawn_worker(task, directory, args):
+    command = [
+        sys.executable, "-m", "benchmarks.run_benchmarks", "--worker", task, "--worker-dir", directory,
+        "--backend", args.backend, "--latency", str(args.latency), "--concurrency", str(args.concurrency),
+        "--batch-size", str(args.batch_size), "--chunk-size", str(args.chunk_size),
+    ] + (["--cache"] if args.cache else [])
+    result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{task} benchmark failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def benchmark(task, ledger_dir, size_label, args):
+    samples = []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory(dir=args.data_dir) as scratch:
+            if task in MUTATING_TASKS or args.backend != "csv" or args.cache:
+                for name in ("transactions.csv", "processed_transactions.csv", "monthly_summary.csv", "real_transactions.csv"):
+                    shutil.copy(os.path.join(ledger_dir, name), scratch)
+                directory = scratch
+            else:
+                directory = ledger_dir
+            samples.append(spawn_worker(task, directory, args))
+
+    # Per-request and per-phase latencies come from the median run
+    samples.sort(key=lambda sample: sample["elapsed"])
+    typical = samples[(len(samples) - 1) // 2]
+    elapsed = median(sample["elapsed"] for sample in samples)
+    rows = typical["rows"]
+    return {
+        "task": task,
+        "size": size_label,
+        "rows": rows,
+        "backend": args.backend,
+        "runs": len(samples),
+        "rows_per_sec": round(rows / elapsed, 1) if rows else 0.0,
+        "median_ms": round(elapsed * 1000, 2),
+        "latency": typical["latency"],
+        "peak_rss_mb": round(max(sample["peak_rss_mb"] for sample in samples), 1),
+        "llm_calls": typical["llm_calls"],
+    }
+
+def result_key(result):
+    return (result["task"], result["size"], result["backend"])
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path) as file:
+        baseline = {result_key(result): result for result in json.load(file)["results"]}
+    regressions = []
+    print(f"\n===== Compared with {baseline_path} =====")
+    for result in results:
+        previous = baseline.get(result_key(result))
+        if not previous or not previous["rows_per_sec"]:
+            continue
+        change = (result["rows_per_sec"] - previous["rows_per_sec"]) / previous["rows_per_sec"]
+        flag = "  REGRESSION" if change < -threshold else ""
+        print(f"{result['task']:<24} {result['size']:>5} {previous['rows_per_sec']:>12.1f} -> {result['rows_per_sec']:>12.1f} rows/s ({change:+.1%}){flag}")
+        if flag:
+            regressions.append(result_key(result))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Throughput benchmarks for the bookkeeping tasks against synthetic ledgers.")
+    parser.add_argument("--sizes", default="1k,100k,1m", help="Comma-separated sizes: 1k, 100k, 1m or row counts")
+    parser.add_argument("--tasks", default=",".join(TASKS))
+    parser.add_argument("--backend", choices=("csv", "sqlite", "partitioned"), default="csv")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the fake LLM sleeps per call")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--cache", action="store_true", help="Give the categorizing tasks a fresh categorization cache")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default="benchmarks/data")
+    parser.add_argument("--output", default="benchmarks/results.json")
+    parser.add_argument("--baseline", help="Earlier results file to compare rows/sec against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Slowdown fraction reported as a regression")
+    parser.add_argument("--worker", choices=TASKS, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_task(args.worker, args.worker_dir, args.backend, args.latency, args.concurrency, args.batch_size, args.chunk_size, args.cache)))
+        return
+
+    from benchmarks.synthetic_ledger import ensure_ledger, parse_size
+    tasks = [task.strip() for task in args.tasks.split(",") if task.strip()]
+    for task in tasks:
+        if task not in TASKS:
+            raise ValueError(f"Unknown benchmark task: {task}")
+    os.makedirs(args.data_dir, exist_ok=True)
+
+    results = []
+    for size_label in args.sizes.split(","):
+        size_label = size_label.strip().lower()
+        print(f"Preparing {size_label} ledger...", flush=True)
+        ledger_dir = ensure_ledger(args.data_dir, parse_size(size_label), args.seed)
+        for task in tasks:
+            result = benchmark(task, ledger_dir, size_label, args)
+            results.append(result)
+            print(f"{task:<24} {size_label:>5} {result['rows_per_sec']:>12.1f} rows/s | median {result['median_ms']:>10.2f} ms | "
+                  f"peak RSS {result['peak_rss_mb']:>7.1f} MB", flush=True)
+            for name, latency in sorted(result["latency"].items()):
+                print(f"{'':<31}{name:<16} x{latency['count']:<8} p50 {latency['p50_ms']:>8.2f} ms | p99 {latency['p99_ms']:>8.2f} ms", flush=True)
+
+    regressions = compare(results, args.baseline, args.threshold) if args.baseline else []
+
+    with open(args.output, "w") as file:
+        json.dump({
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": {key: getattr(args, key) for key in ("backend", "runs", "latency", "concurrency", "batch_size", "chunk_size", "cache", "seed")},
+            "results": results,
+        }, file, indent=2)
+    print(f"\nResults written to {args.output}")
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPORT_COMMANDS = ["status", "ar-aging", "ap-aging", "aging"]
+HEAVY_MODULES = ("langchain", "langchain_community", "langchain_openai", "requests", "numpy", "sqlite3")
+
+def scratch_env(directory):
+    # Point every ledger path at a throwaway copy so the benchmark never touches example/
+    shutil.copy(os.path.join(ROOT, "example", "transactions.csv"), os.path.join(directory, "transactions.csv"))
+    env = dict(os.environ)
+    env.update({
+        "RAW_CSV": os.path.join(directory, "transactions.csv"),
+        "PROCESSED_CSV": os.path.join(directory, "processed_transactions.csv"),
+        "SUMMARY_CSV": os.path.join(directory, "monthly_summary.csv"),
+        "CATEGORY_CACHE_PATH": os.path.join(directory, "category_cache.json"),
+        "INGEST_CHECKPOINT_PATH": os.path.join(directory, "ingest_checkpoint.json"),
+        "LEDGER_DB_PATH": os.path.join(directory, "ledger.db"),
+    })
+    return env
+
+def time_command(command, env, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(ROOT, "main.py"), command], env=env, cwd=ROOT,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def imported_heavy_modules(command, env):
+    # -X importtime lists every module the interpreter imported, one per stderr line
+    result = subprocess.run([sys.executable, "-X", "importtime", os.path.join(ROOT, "main.py"), command], env=env, cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        module = line.rsplit("|", 1)[1].strip()
+        if module.split(".")[0] in HEAVY_MODULES:
+            imported.add(module.split(".")[0])
+    return sorted(imported)
+
+def time_import(module, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", f"import {module}"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if result.returncode != 0:
+            return None
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def summarize(timings):
+    return {"min_ms": round(min(timings), 1), "median_ms": round(statistics.median(timings), 1), "runs": len(timings)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start time of the report-only CLI commands")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = {"python": sys.version.split()[0], "commands": {}, "baseline": {}}
+    with tempfile.TemporaryDirectory() as directory:
+        env = scratch_env(directory)
+        subprocess.run([sys.executable, os.path.join(ROOT, "main.py"), "status"], env=env, cwd=ROOT,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        for command in REPORT_COMMANDS:
+            results["commands"][command] = summarize(time_command(command, env, args.runs))
+            results["commands"][command]["heavy_imports"] = imported_heavy_modules(command, env)
+
+    # What an eager provider import would have added to every one of those commands
+    for module in ("langchain_community.llms", "langchain_openai"):
+        timings = time_import(module, args.runs)
+        results["baseline"][module] = summarize(timings) if timings else "not installed"
+
+    print("===== Cold start: report-only commands =====")
+    for command, stats in results["commands"].items():
+        heavy = ", ".join(stats["heavy_imports"]) or "none"
+        print(f"{command:<10} min {stats['min_ms']:>8.1f} ms | median {stats['median_ms']:>8.1f} ms | heavy imports: {heavy}")
+    print("\n===== Provider import cost avoided =====")
+    for module, stats in results["baseline"].items():
+        if isinstance(stats, dict):
+            print(f"{module:<26} min {stats['min_ms']:>8.1f} ms | median {stats['median_ms']:>8.1f} ms")
+        else:
+            print(f"{module:<26} {stats}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as file:
+            json.dump(results, file, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import csv
+import os
+import random
+from datetime import date, timedelta
+from itertools import islice
+from benchmarks.fake_llm import FakeLLM
+from storage.base_storage import RAW_FIELDS
+from storage.csv_storage import CsvLedgerStorage
+from tasks.process_transactions_task import ProcessTransactionsTask
+from utils.money import Money
+from utils.rule_engine import DEFAULT_RULES, RuleEngine
+
+SIZES = {"1k": 1000, "100k": 100000, "1m": 1000000}
+
+# (description template, low, high) in dollars; the sign of the range sets the direction of the money
+VENDORS = [
+    ("Customer invoice #{n}", 100, 5000),
+    ("Stripe payout {n}", 200, 20000),
+    ("Payment from customer {n}", 50, 3000),
+    ("Office rent payment {month}", -4000, -1500),
+    ("AWS hosting bill {month}", -900, -50),
+    ("Software subscription - Figma {n}", -120, -15),
+    ("Contractor consulting fee {n}", -6000, -500),
+    ("Team lunch at Bistro {n}", -250, -20),
+    ("Flight to conference {n}", -1200, -150),
+    ("Google Ads campaign {n}", -3000, -100),
+    ("Bank wire fee {n}", -45, -5),
+    ("Misc card refund {n}", 5, 200),
+]
+
+def parse_size(value):
+    value = value.strip().lower()
+    if value in SIZES:
+        return SIZES[value]
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Invalid ledger size: {value!r} (use 1k, 100k, 1m or a row count)") from None
+
+def generate_transactions(count, seed=0, start=date(2024, 1, 1), days=730):
+    # The same count and seed always produce the same ledger, so runs are comparable
+    rng = random.Random(seed)
+    for transaction_id in range(1, count + 1):
+        template, low, high = rng.choice(VENDORS)
+        day = start + timedelta(days=rng.randrange(days))
+        description = template.format(n=rng.randrange(1000, 99999), month=day.strftime("%B %Y"))
+        amount = Money.from_cents(rng.randrange(int(low * 100), int(high * 100) + 1))
+        yield {'transaction_id': transaction_id, 'date': day.isoformat(), 'description': description, 'amount': amount}
+
+def write_ledger(directory, count, seed=0, processed=True, chunk_size=5000):
+    os.makedirs(directory, exist_ok=True)
+    raw_csv = os.path.join(directory, "transactions.csv")
+    processed_csv = os.path.join(directory, "processed_transactions.csv")
+    summary_csv = os.path.join(directory, "monthly_summary.csv")
+    categorize_csv = os.path.join(directory, "real_transactions.csv")
+    for path in (raw_csv, processed_csv, summary_csv, categorize_csv):
+        if os.path.exists(path):
+            os.remove(path)
+
+    with open(raw_csv, mode='w', newline='') as raw_file, open(categorize_csv, mode='w', newline='') as categorize_file:
+        raw_writer = csv.DictWriter(raw_file, fieldnames=RAW_FIELDS)
+        raw_writer.writeheader()
+        categorize_writer = csv.DictWriter(categorize_file, fieldnames=['date', 'description', 'amount', 'category'])
+        categorize_writer.writeheader()
+        for row in generate_transactions(count, seed):
+            raw_writer.writerow(row)
+            categorize_writer.writerow({
+                'date': row['date'], 'description': row['description'], 'amount': row['amount'], 'category': "Uncategorized"
+            })
+
+    if processed:
+        # Processed rows come from the real task code so types and due dates match production exactly
+        storage = CsvLedgerStorage(raw_csv, processed_csv, summary_csv)
+        task = ProcessTransactionsTask(FakeLLM(), storage=storage, rules=RuleEngine(DEFAULT_RULES), chunk_size=chunk_size)
+        rows = storage.iter_transactions()
+        # Fed a chunk at a time so a million-row ledger never holds all its posted rows at once
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            task.process_rows(chunk)
+    return {"raw_csv": raw_csv, "processed_csv": processed_csv, "summary_csv": summary_csv, "categorize_csv": categorize_csv}
+
+def ledger_directory(data_dir, count, seed):
+    return os.path.join(data_dir, f"ledger-{count}-seed{seed}")
+
+def ensure_ledger(data_dir, count, seed=0):
+    # Generating a million processed rows takes a while, so a finished ledger is reused across runs
+    directory = ledger_directory(data_dir, count, seed)
+    marker = os.path.join(directory, ".complete")
+    if not os.path.isfile(marker):
+        write_ledger(directory, count, seed)
+        open(marker, "w").close()
+    return directory
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic ledgers for the benchmark suite.")
+    parser.add_argument("--sizes", default="1k,100k,1m", help="Comma-separated sizes: 1k, 100k, 1m or row counts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default="benchmarks/data")
+    args = parser.parse_args()
+
+    for size in args.sizes.split(","):
+        directory = ensure_ledger(args.data_dir, parse_size(size), args.seed)
+        print(f"{size}: {directory}")
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,10 @@
+import argparse
 from utils.env_loader import load_env
-from utils.model_loader import load_model
+from utils.model_loader import LazyModel
 from agents.bookkeeper_agent import BookkeeperAgent
-import csv
-import os
-
-def view_status(summary_csv="example/monthly_summary.csv"):
-    if not os.path.isfile(summary_csv):
-        print("No summary available yet.")
-        return
-
-    print("\n====== Current Financial Status ======")
-    with open(summary_csv, mode='r') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            print(f"\nMonth: {row['month']}")
-            print(f"  Accounts Payable: {row['accounts_payable']}")
-            print(f"  Accounts Receivable: {row['accounts_receivable']}")
-            print(f"  Revenue: {row['revenue']}")
-            print(f"  Expenses: {row['expenses']}")
-            print(f"  Net Income: {row['net_income']}")
-
-def main():
-    config = load_env()
-    model = load_model(config)
-    agent = BookkeeperAgent(model)
+from utils.money import Money
 
+def interactive_menu(agent):
     while True:
         print("\n===== Bookkeeper CLI =====")
         print("[1] Add a new transaction manually")
@@ -33,42 +13,135 @@ def main():
         print("[4] Generate AR Aging Report")
         print("[5] Generate AP Aging Report")
         print("[6] Mark a Transaction as Paid")
-        print("[7] Exit")
+        print("[7] Verify/rebuild monthly summary")
+        print("[8] Generate AR + AP Aging Reports (single pass)")
+        print("[9] Exit")
 
-        choice = input("\nEnter your choice (1-7): ")
+        choice = input("\nEnter your choice (1-9): ")
 
         if choice == '1':
             description = input("Enter transaction description: ")
-            amount = float(input("Enter transaction amount: "))
+            amount = Money.parse(input("Enter transaction amount: "))
             print(agent.run("add_transaction", description=description, amount=amount))
 
         elif choice == '2':
             print(agent.run("process_transactions"))
 
         elif choice == '3':
-            view_status()
+            agent.run("view_status")
 
         elif choice == '4':
-            from tasks.generate_ar_aging_report import GenerateARAgingReportTask
-            report_task = GenerateARAgingReportTask()
-            print(report_task.execute())
+            print(agent.run("ar_aging_report"))
 
         elif choice == '5':
-            from tasks.generate_ap_aging_report import GenerateAPAgingReportTask
-            report_task = GenerateAPAgingReportTask()
-            print(report_task.execute())
+            print(agent.run("ap_aging_report"))
 
         elif choice == '6':
-            from tasks.mark_transaction_paid_task import MarkTransactionPaidTask
-            task = MarkTransactionPaidTask()
-            print(task.execute())
+            print(agent.run("mark_transaction_paid"))
 
         elif choice == '7':
+            rebuild = input("Rebuild the summary if it disagrees with the ledger? (y/N): ").strip().lower() == 'y'
+            print(agent.run("verify_summary", rebuild=rebuild))
+
+        elif choice == '8':
+            print(agent.run("aging_reports"))
+
+        elif choice == '9':
             print("Exiting...")
             break
 
         else:
             print("Invalid choice. Please try again.")
 
+def build_parser():
+    parser = argparse.ArgumentParser(description="Bookkeeper agent. Run without a command for the interactive menu.")
+    parser.add_argument("--profile", metavar="PATH", help="Dump a cProfile of each task run to PATH ('{task}' is replaced by the task name)")
+    parser.add_argument("--metrics", metavar="PATH", help="Export metrics to PATH after each task run (overrides METRICS_PATH)")
+    parser.add_argument("--metrics-format", choices=("prometheus", "jsonl"), help="Overrides METRICS_FORMAT")
+    subparsers = parser.add_subparsers(dest="command")
+
+    add = subparsers.add_parser("add", help="Add a transaction")
+    add.add_argument("--description", required=True)
+    add.add_argument("--amount", required=True, type=Money.parse)
+    add.add_argument("--date", help="YYYY-MM-DD, defaults to today")
+
+    subparsers.add_parser("process", help="Categorize and post unprocessed transactions")
+    watch = subparsers.add_parser("watch", help="Post new transactions as they are appended or dropped in")
+    watch.add_argument("--interval", type=float, help="Seconds between polls (default WATCH_INTERVAL)")
+    watch.add_argument("--drop-dir", help="Also ingest CSV files (date, description, amount) dropped here")
+    watch.add_argument("--once", action="store_true", help="Poll once and exit")
+    entities = subparsers.add_parser("process-entities", help="Process every entity ledger in parallel worker processes")
+    entities.add_argument("--entities", help="Directory of entity ledgers or a JSON manifest (default ENTITIES_PATH)")
+    entities.add_argument("--workers", type=int, help="Worker processes (default ENTITY_WORKERS)")
+    entities.add_argument("--output", help="Consolidated summary CSV (default CONSOLIDATED_SUMMARY_CSV)")
+    subparsers.add_parser("categorize", help="Fill in uncategorized rows of the categorization CSV")
+    status = subparsers.add_parser("status", help="Show the monthly financial status")
+    status.add_argument("--since", help="YYYY-MM; only show this month and later")
+    subparsers.add_parser("ar-aging", help="Accounts Receivable aging report")
+    subparsers.add_parser("ap-aging", help="Accounts Payable aging report")
+    subparsers.add_parser("aging", help="AR and AP aging reports in one pass")
+
+    mark_paid = subparsers.add_parser("mark-paid", help="Mark processed transactions as Paid")
+    settle_from = mark_paid.add_mutually_exclusive_group(required=True)
+    settle_from.add_argument("--id", dest="transaction_ids", action="append", default=[], help="Repeat to settle several")
+    settle_from.add_argument("--remittance", help="CSV with transaction_id, or amount and date, per payment")
+
+    verify = subparsers.add_parser("verify-summary", help="Check the monthly summary against the ledger")
+    verify.add_argument("--rebuild", action="store_true", help="Rewrite the summary if it disagrees")
+
+    serve = subparsers.add_parser("serve", help="Serve every task over HTTP")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8080)
+    return parser
+
+def run_command(agent, args):
+    if args.command == "add":
+        return agent.run("add_transaction", description=args.description, amount=args.amount, date=args.date)
+    if args.command == "process":
+        return agent.run("process_transactions")
+    if args.command == "watch":
+        return agent.run("watch_transactions", interval=args.interval, drop_dir=args.drop_dir, once=args.once)
+    if args.command == "process-entities":
+        return agent.run("process_entities", source=args.entities, workers=args.workers, output=args.output)
+    if args.command == "categorize":
+        return agent.run("categorize_transactions")
+    if args.command == "status":
+        return agent.run("view_status", since=args.since)
+    if args.command == "ar-aging":
+        return agent.run("ar_aging_report")
+    if args.command == "ap-aging":
+        return agent.run("ap_aging_report")
+    if args.command == "aging":
+        return agent.run("aging_reports")
+    if args.command == "mark-paid":
+        if len(args.transaction_ids) == 1 and not args.remittance:
+            return agent.run("mark_transaction_paid", transaction_id=args.transaction_ids[0], interactive=False)
+        return agent.run("mark_transaction_paid", transaction_ids=args.transaction_ids,
+                         remittance_file=args.remittance, interactive=False)
+    if args.command == "verify-summary":
+        return agent.run("verify_summary", rebuild=args.rebuild)
+    raise ValueError(f"Unknown command: {args.command}")
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    config = load_env()
+    if args.metrics:
+        config["METRICS_PATH"] = args.metrics
+    if args.metrics_format:
+        config["METRICS_FORMAT"] = args.metrics_format
+    # The client is only built if a task calls the model; status and aging never do
+    model = LazyModel(config)
+    agent = BookkeeperAgent(model, config, profile_path=args.profile)
+
+    if args.command is None:
+        interactive_menu(agent)
+    elif args.command == "serve":
+        from service.http_service import run_service
+        run_service(agent, args.host, args.port)
+    else:
+        result = run_command(agent, args)
+        if result is not None:
+            print(result)
+
 if __name__ == "__main__":
     main()
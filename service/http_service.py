@@ -0,0 +1,178 @@
+import asyncio
+from http import HTTPStatus
+import inspect
+import io
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils.metrics import METRICS
+
+MAX_BODY_BYTES = 1024 * 1024
+
+class _ThreadLocalStdout:
+    # Tasks report by printing; route each worker thread's prints into its own buffer
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def capture(self, buffer):
+        self._local.buffer = buffer
+
+    def release(self):
+        self._local.buffer = None
+
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer or self._stream).write(text)
+
+    def flush(self):
+        buffer = getattr(self._local, "buffer", None)
+        (buffer or self._stream).flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+class _ReadWriteLock:
+    # Any number of read-only tasks may run together; a writing task runs alone
+    def __init__(self):
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writing = False
+
+    async def acquire_read(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._writing)
+            self._readers += 1
+
+    async def release_read(self):
+        async with self._condition:
+            self._readers -= 1
+            self._condition.notify_all()
+
+    async def acquire_write(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._writing and self._readers == 0)
+            self._writing = True
+
+    async def release_write(self):
+        async with self._condition:
+            self._writing = False
+            self._condition.notify_all()
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class BookkeeperService:
+    # Keeps one agent (and so one model client and storage handle) warm across requests
+    def __init__(self, agent, max_workers=8):
+        self.agent = agent
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.lock = None
+        self.stdout = None
+
+    async def serve(self, host="127.0.0.1", port=8080):
+        self.lock = _ReadWriteLock()
+        if not isinstance(sys.stdout, _ThreadLocalStdout):
+            sys.stdout = _ThreadLocalStdout(sys.stdout)
+        self.stdout = sys.stdout
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        print(f"Bookkeeper service listening on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            method, path, body = await self._read_request(reader)
+            status, payload = 200, await self._route(method, path, body)
+        except HttpError as error:
+            status, payload = error.status, {"error": str(error)}
+        except (ValueError, TypeError) as error:
+            status, payload = 400, {"error": str(error)}
+        except Exception as error:
+            status, payload = 500, {"error": f"{type(error).__name__}: {error}"}
+
+        if isinstance(payload, str):
+            data, content_type = payload.encode(), "text/plain; version=0.0.4"
+        else:
+            data, content_type = json.dumps(payload).encode(), "application/json"
+        writer.write(
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+            f"Content-Type: {content_type}\r\nContent-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode()
+            + data
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) < 2:
+            raise HttpError(400, "Malformed request line")
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", "0"))
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return request_line[0].upper(), request_line[1], body
+
+    async def _route(self, method, path, body):
+        if method == "GET" and path == "/health":
+            return {"status": "ok"}
+        if method == "GET" and path == "/metrics":
+            # Prometheus text exposition, scraped straight from the process-wide registry
+            return METRICS.to_prometheus()
+        if method == "GET" and path == "/tasks":
+            return {"tasks": [
+                {"name": name, "read_only": self.agent.is_read_only(name)} for name in sorted(self.agent.tasks)
+            ]}
+        if path.startswith("/tasks/"):
+            if method != "POST":
+                raise HttpError(405, "Use POST to run a task")
+            task_name = path[len("/tasks/"):]
+            if task_name not in self.agent.tasks:
+                raise HttpError(404, f"Unknown task: {task_name}")
+            kwargs = json.loads(body) if body else {}
+            if not isinstance(kwargs, dict):
+                raise HttpError(400, "Request body must be a JSON object of task arguments")
+            return await self._run_task(task_name, kwargs)
+        raise HttpError(404, f"No route for {method} {path}")
+
+    async def _run_task(self, task_name, kwargs):
+        # Never fall back to input() prompts inside the service, and never start an endless loop: it would
+        # hold the write lock forever on a worker thread Ctrl+C can't reach. Watch mode polls once per request
+        parameters = inspect.signature(self.agent.tasks[task_name].execute).parameters
+        if "interactive" in parameters:
+            kwargs["interactive"] = False
+        if "once" in parameters:
+            kwargs["once"] = True
+
+        read_only = self.agent.is_read_only(task_name)
+        await (self.lock.acquire_read() if read_only else self.lock.acquire_write())
+        try:
+            loop = asyncio.get_running_loop()
+            result, output = await loop.run_in_executor(self.executor, self._execute, task_name, kwargs)
+        finally:
+            await (self.lock.release_read() if read_only else self.lock.release_write())
+        return {"task": task_name, "result": None if result is None else str(result), "output": output}
+
+    def _execute(self, task_name, kwargs):
+        buffer = io.StringIO()
+        self.stdout.capture(buffer)
+        try:
+            result = self.agent.run(task_name, **kwargs)
+        finally:
+            self.stdout.release()
+        return result, buffer.getvalue()
+
+def run_service(agent, host="127.0.0.1", port=8080):
+    asyncio.run(BookkeeperService(agent).serve(host, port))
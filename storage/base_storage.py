@@ -0,0 +1,107 @@
+from abc import ABC, abstractmethod
+from .summary import TOTAL_FIELDS, add_row, empty_totals
+
+RAW_FIELDS = ['transaction_id', 'date', 'description', 'amount']
+PROCESSED_FIELDS = ['transaction_id', 'date', 'description', 'amount', 'category', 'type', 'month', 'due_date', 'payment_status']
+
+class BaseLedgerStorage(ABC):
+    # Appends a raw transaction under the next free ID and returns that ID
+    @abstractmethod
+    def add_transaction(self, date, description, amount):
+        pass
+
+    # Appends several (date, description, amount) entries under consecutive IDs and returns the IDs
+    def add_transactions(self, entries):
+        return [self.add_transaction(date, description, amount) for date, description, amount in entries]
+
+    @abstractmethod
+    def iter_transactions(self):
+        pass
+
+    @abstractmethod
+    def processed_ids(self):
+        pass
+
+    # Appends processed rows and folds them into the monthly summary
+    @abstractmethod
+    def append_processed(self, rows):
+        pass
+
+    # since is an inclusive "YYYY-MM" lower bound on the row's month
+    @abstractmethod
+    def iter_processed(self, types=None, payment_status=None, since=None):
+        pass
+
+    @abstractmethod
+    def get_processed(self, transaction_id):
+        pass
+
+    # Updates every listed transaction in one pass, moves the affected monthly totals
+    # and returns how many rows changed
+    @abstractmethod
+    def set_payment_status(self, transaction_ids, payment_status):
+        pass
+
+    @abstractmethod
+    def load_summary(self):
+        pass
+
+    # Adds {month: {column: delta}} to the stored totals, touching only those months
+    @abstractmethod
+    def apply_summary_deltas(self, deltas):
+        pass
+
+    @abstractmethod
+    def replace_summary(self, summary):
+        pass
+
+    def iter_unprocessed_transactions(self, resume_after=None):
+        # resume_after is the last transaction_id a previous run committed; rows up to and including
+        # it are skipped without looking at them. If it never shows up, fall back to a full scan.
+        processed_ids = self.processed_ids()
+        rows = self.iter_transactions()
+        if resume_after is not None:
+            resume_after = str(resume_after)
+            for row in rows:
+                if row['transaction_id'] == resume_after:
+                    break
+            else:
+                rows = self.iter_transactions()
+        for row in rows:
+            if row['transaction_id'] not in processed_ids:
+                yield row
+
+    def tail_transactions(self, position=None):
+        # Returns (raw rows added since position, new position). position is opaque to callers:
+        # here it is the last transaction_id seen, and None means "start from the current end"
+        last_id = -1 if position is None else int(position)
+        rows = [row for row in self.iter_transactions() if int(row['transaction_id']) > last_id]
+        new_position = max([int(row['transaction_id']) for row in rows], default=last_id)
+        if position is None:
+            return [], max(new_position, 0)
+        return rows, new_position
+
+    def compute_summary(self):
+        summary = {}
+        for row in self.iter_processed():
+            add_row(summary, row)
+        return summary
+
+    def verify_summary(self):
+        # Returns (month, column, stored, expected) for every total that disagrees with the ledger
+        stored = self.load_summary()
+        expected = self.compute_summary()
+        discrepancies = []
+        for month in sorted(set(stored) | set(expected)):
+            stored_totals = stored.get(month, empty_totals())
+            expected_totals = expected.get(month, empty_totals())
+            for field in TOTAL_FIELDS:
+                if stored_totals[field] != expected_totals[field]:
+                    discrepancies.append((month, field, stored_totals[field], expected_totals[field]))
+        return discrepancies
+
+    def rebuild_summary(self):
+        self.replace_summary(self.compute_summary())
+
+    def close(self):
+        pass
@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+
+class IngestCheckpoint:
+    def __init__(self, path="example/ingest_checkpoint.json"):
+        self.path = path
+
+    def load(self):
+        if not os.path.isfile(self.path):
+            return {}
+        with open(self.path, mode='r') as file:
+            return json.load(file)
+
+    def last_transaction_id(self):
+        return self.load().get('last_transaction_id')
+
+    def commit(self, last_transaction_id, rows_committed):
+        state = self.load()
+        state['last_transaction_id'] = str(last_transaction_id)
+        state['rows_committed'] = state.get('rows_committed', 0) + rows_committed
+        write_json_durably(self.path, state)
+
+    def clear(self):
+        if os.path.isfile(self.path):
+            os.remove(self.path)
+
+def write_json_durably(path, data):
+    # Write a sibling file, fsync it, then swap it in so readers never see a torn checkpoint
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile('w', dir=directory, delete=False) as tmpfile:
+        json.dump(data, tmpfile)
+        tmpfile.flush()
+        os.fsync(tmpfile.fileno())
+    os.replace(tmpfile.name, path)
+
+class WatchState:
+    # Where watch mode has read up to: the storage's tail position (a byte offset for CSV ledgers),
+    # the last transaction_id it handled, and raw rows deferred while the model was unavailable.
+    # in_flight marks a poll that was posting rows when it was saved
+    def __init__(self, path="example/watch_state.json"):
+        self.path = path
+
+    def load(self):
+        if not os.path.isfile(self.path):
+            return None
+        with open(self.path, mode='r') as file:
+            return json.load(file)
+
+    def save(self, position, last_transaction_id, deferred=(), in_flight=False):
+        write_json_durably(self.path, {
+            'position': position,
+            'in_flight': in_flight,
+            'last_transaction_id': None if last_transaction_id is None else str(last_transaction_id),
+            'deferred': [{field: str(row[field]) for field in ('transaction_id', 'date', 'description', 'amount')} for row in deferred],
+        })
@@ -0,0 +1,196 @@
+import csv
+import io
+import os
+import tempfile
+from .base_storage import BaseLedgerStorage, RAW_FIELDS, PROCESSED_FIELDS
+from utils.metrics import METRICS
+from utils.money import Money
+from .id_allocator import IdAllocator, WriteAheadLog
+from .summary import TOTAL_FIELDS, add_row, empty_totals, status_change_deltas, write_summary_csv
+
+class CsvLedgerStorage(BaseLedgerStorage):
+    def __init__(self, raw_csv="example/transactions.csv", processed_csv="example/processed_transactions.csv", summary_csv="example/monthly_summary.csv"):
+        self.raw_csv = raw_csv
+        self.processed_csv = processed_csv
+        self.summary_csv = summary_csv
+        self.id_allocator = IdAllocator(f"{raw_csv}.hwm")
+        self.wal = WriteAheadLog(f"{raw_csv}.wal")
+
+    def add_transaction(self, date, description, amount):
+        return self.add_transactions([(date, description, amount)])[0]
+
+    def add_transactions(self, entries):
+        if not entries:
+            return []
+        with self.id_allocator.locked():
+            self._recover_wal()
+            first_id, state = self.id_allocator.reserve(len(entries), self._raw_size(), self._find_next_transaction_id)
+            rows = [
+                {'transaction_id': first_id + offset, 'date': date, 'description': description, 'amount': str(Money.parse(amount))}
+                for offset, (date, description, amount) in enumerate(entries)
+            ]
+            # Log first, then append: a crash in between is replayed by the next writer
+            self.wal.append(rows)
+            self._append_rows(self.raw_csv, RAW_FIELDS, rows)
+            self.id_allocator.commit(state, self._raw_size())
+            self.wal.clear()
+        return [row['transaction_id'] for row in rows]
+
+    def iter_transactions(self):
+        for row in self._read_rows(self.raw_csv):
+            row['amount'] = Money.parse(row['amount'])
+            yield row
+
+    def tail_transactions(self, position=None):
+        # position is a byte offset into the raw CSV. Only whole lines are consumed, so a row that is
+        # still being written is picked up by the next call; a file that shrank is re-read from the top
+        size = self._raw_size()
+        if position is None:
+            return [], self._last_line_end(size)
+        start = 0 if position > size else position
+        if start == size:
+            return [], size
+        with open(self.raw_csv, mode='rb') as file:
+            file.seek(start)
+            data = file.read(size - start)
+        end = data.rfind(b"\n") + 1
+        # A newline inside a quoted description is not a row boundary
+        while end and data.count(b'"', 0, end) % 2:
+            end = data.rfind(b"\n", 0, end - 1) + 1
+        rows = []
+        for row in csv.DictReader(io.StringIO(data[:end].decode()), fieldnames=RAW_FIELDS):
+            if row['transaction_id'] == 'transaction_id':
+                continue
+            row['amount'] = Money.parse(row['amount'])
+            rows.append(row)
+        return rows, start + end
+
+    def processed_ids(self):
+        return {row['transaction_id'] for row in self._read_rows(self.processed_csv) if 'transaction_id' in row}
+
+    def append_processed(self, rows):
+        self._append_rows(self.processed_csv, PROCESSED_FIELDS, rows)
+        deltas = {}
+        for row in rows:
+            add_row(deltas, row)
+        self.apply_summary_deltas(deltas)
+
+    def iter_processed(self, types=None, payment_status=None, since=None):
+        for row in self._read_rows(self.processed_csv):
+            # Older ledgers predate the due_date and payment_status columns
+            row['due_date'] = row.get('due_date') or row.get('date', '')
+            row['payment_status'] = row.get('payment_status') or 'Unpaid'
+            row['amount'] = Money.parse(row['amount'])
+            if types is not None and row['type'] not in types:
+                continue
+            if payment_status is not None and row['payment_status'] != payment_status:
+                continue
+            if since is not None and row['month'] < since:
+                continue
+            yield row
+
+    def get_processed(self, transaction_id):
+        transaction_id = str(transaction_id)
+        for row in self.iter_processed():
+            if row['transaction_id'] == transaction_id:
+                return row
+        return None
+
+    def set_payment_status(self, transaction_ids, payment_status):
+        if not os.path.isfile(self.processed_csv):
+            return 0
+        transaction_ids = {str(transaction_id) for transaction_id in transaction_ids}
+        changed_rows = []
+
+        directory = os.path.dirname(self.processed_csv) or "."
+        with open(self.processed_csv, mode='r') as file, \
+                tempfile.NamedTemporaryFile('w', dir=directory, delete=False, newline='') as tmpfile:
+            reader = csv.DictReader(file)
+            fieldnames = reader.fieldnames.copy()
+            for field in ('due_date', 'payment_status'):
+                if field not in fieldnames:
+                    fieldnames.append(field)
+
+            writer = csv.DictWriter(tmpfile, fieldnames=fieldnames)
+            writer.writeheader()
+            for row in reader:
+                row['due_date'] = row.get('due_date') or row.get('date', '')
+                row['payment_status'] = row.get('payment_status') or 'Unpaid'
+                if row['transaction_id'] in transaction_ids and row['payment_status'] != payment_status:
+                    changed_rows.append(dict(row))
+                    row['payment_status'] = payment_status
+                writer.writerow(row)
+
+        os.replace(tmpfile.name, self.processed_csv)
+        self.apply_summary_deltas(status_change_deltas(changed_rows, payment_status))
+        return len(changed_rows)
+
+    def load_summary(self):
+        summary = {}
+        for row in self._read_rows(self.summary_csv):
+            summary[row['month']] = {field: Money.parse(row[field]) for field in TOTAL_FIELDS}
+        return summary
+
+    def apply_summary_deltas(self, deltas):
+        if not deltas:
+            return
+        # The summary holds one row per month, so rewriting it never touches transaction history
+        with METRICS.span("summary_update", backend="csv"):
+            summary = self.load_summary()
+            for month, totals in deltas.items():
+                stored = summary.setdefault(month, empty_totals())
+                for field in TOTAL_FIELDS:
+                    stored[field] += Money.parse(totals[field])
+            self.replace_summary(summary)
+
+    def replace_summary(self, summary):
+        write_summary_csv(self.summary_csv, summary)
+
+    def _recover_wal(self):
+        pending = self.wal.pending()
+        if not pending:
+            return
+        # Only reached after a crash, so a full scan for the logged IDs is acceptable here
+        pending_ids = {str(row['transaction_id']) for row in pending}
+        written = {row['transaction_id'] for row in self._read_rows(self.raw_csv) if row.get('transaction_id') in pending_ids}
+        self._append_rows(self.raw_csv, RAW_FIELDS, [row for row in pending if str(row['transaction_id']) not in written])
+        self.wal.clear()
+
+    def _last_line_end(self, size):
+        # Offset just past the last complete line; only the tail of the file is read
+        if not size:
+            return 0
+        with open(self.raw_csv, mode='rb') as file:
+            offset = max(0, size - 65536)
+            file.seek(offset)
+            newline = file.read(size - offset).rfind(b"\n")
+            if newline == -1 and offset:
+                file.seek(0)
+                offset, newline = 0, file.read(size).rfind(b"\n")
+        return offset + newline + 1
+
+    def _raw_size(self):
+        return os.path.getsize(self.raw_csv) if os.path.isfile(self.raw_csv) else 0
+
+    def _find_next_transaction_id(self):
+        ids = [int(row['transaction_id']) for row in self._read_rows(self.raw_csv) if row.get('transaction_id', '').isdigit()]
+        if ids:
+            return max(ids) + 1
+        return 1
+
+    def _read_rows(self, path):
+        if not os.path.isfile(path):
+            return
+        with open(path, mode='r', newline='') as file:
+            yield from csv.DictReader(file)
+
+    def _append_rows(self, path, fieldnames, rows):
+        file_exists = os.path.isfile(path)
+        with open(path, mode='a', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=fieldnames)
+            if not file_exists:
+                writer.writeheader()
+            writer.writerows(rows)
+            # Each append is a committed chunk; make sure it reaches the disk before it is checkpointed
+            file.flush()
+            os.fsync(file.fileno())
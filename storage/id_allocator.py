@@ -0,0 +1,78 @@
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+
+@contextmanager
+def file_lock(path):
+    # An exclusive flock on path, held for the with block; serializes writers across processes
+    with open(path, mode='a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+class IdAllocator:
+    # Persists the next free transaction_id next to the raw ledger so adds never rescan it.
+    # The recorded ledger size detects edits made behind the allocator's back.
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+
+    def locked(self):
+        # Serializes allocation (and the append that follows) across processes
+        return file_lock(self.lock_path)
+
+    def reserve(self, count, ledger_size, scan_next_id):
+        # Caller holds the lock; returns the first of `count` consecutive IDs
+        state = self._load()
+        if state is None or state.get('ledger_size') != ledger_size:
+            state = {'next_id': scan_next_id()}
+        first_id = state['next_id']
+        state['next_id'] = first_id + count
+        return first_id, state
+
+    def commit(self, state, ledger_size):
+        state['ledger_size'] = ledger_size
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, mode='w') as file:
+            json.dump(state, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _load(self):
+        if not os.path.isfile(self.path):
+            return None
+        with open(self.path, mode='r') as file:
+            return json.load(file)
+
+class WriteAheadLog:
+    # Holds raw rows that were allocated but not yet confirmed in the ledger
+    def __init__(self, path):
+        self.path = path
+
+    def append(self, rows):
+        with open(self.path, mode='a') as file:
+            for row in rows:
+                file.write(json.dumps(row) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def pending(self):
+        if not os.path.isfile(self.path):
+            return []
+        rows = []
+        with open(self.path, mode='r') as file:
+            for line in file:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    break  # A torn final record was never acknowledged to the caller
+        return rows
+
+    def clear(self):
+        with open(self.path, mode='w') as file:
+            file.flush()
+            os.fsync(file.fileno())
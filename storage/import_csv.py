@@ -0,0 +1,53 @@
+import argparse
+import csv
+import os
+from utils.money import Money
+from .sqlite_storage import PROCESSED_COLUMNS, SqliteLedgerStorage
+
+def import_csv_ledger(storage, raw_csv="example/transactions.csv", processed_csv="example/processed_transactions.csv"):
+    raw_count = processed_count = 0
+
+    if os.path.isfile(raw_csv):
+        with open(raw_csv, mode='r', newline='') as file, storage.conn:
+            rows = (
+                (int(row['transaction_id']), row['date'], row['description'], Money.parse(row['amount']).cents)
+                for row in csv.DictReader(file)
+            )
+            cursor = storage.conn.executemany(
+                "INSERT OR IGNORE INTO transactions (transaction_id, date, description, amount_cents) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            raw_count = cursor.rowcount
+
+    if os.path.isfile(processed_csv):
+        with open(processed_csv, mode='r', newline='') as file, storage.conn:
+            rows = (
+                [int(row['transaction_id']), row['date'], row['description'], Money.parse(row['amount']).cents]
+                + [row.get(field) or '' for field in ('category', 'type', 'month')]
+                + [row.get('due_date') or row['date'], row.get('payment_status') or 'Unpaid']
+                for row in csv.DictReader(file)
+            )
+            cursor = storage.conn.executemany(
+                f"INSERT OR IGNORE INTO processed_transactions ({', '.join(PROCESSED_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in PROCESSED_COLUMNS)})",
+                rows,
+            )
+            processed_count = cursor.rowcount
+
+    storage.rebuild_summary()
+    return raw_count, processed_count
+
+def main():
+    parser = argparse.ArgumentParser(description="Import existing CSV ledgers into a SQLite ledger database.")
+    parser.add_argument("--raw", default="example/transactions.csv")
+    parser.add_argument("--processed", default="example/processed_transactions.csv")
+    parser.add_argument("--db", default="example/ledger.db")
+    args = parser.parse_args()
+
+    storage = SqliteLedgerStorage(args.db)
+    raw_count, processed_count = import_csv_ledger(storage, args.raw, args.processed)
+    storage.close()
+    print(f"Imported {raw_count} raw and {processed_count} processed transaction(s) into {args.db}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+import argparse
+import csv
+import io
+import json
+import mmap
+import os
+import tempfile
+from bisect import bisect_left
+from .base_storage import PROCESSED_FIELDS
+from .checkpoint import write_json_durably
+from .csv_storage import CsvLedgerStorage
+from .id_allocator import file_lock
+from .summary import add_row, status_change_deltas
+from utils.metrics import METRICS
+from utils.money import Money
+
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = "manifest.lock"
+
+def empty_partition(file_name):
+    return {
+        "file": file_name, "rows": 0, "bytes": 0, "min_id": None, "max_id": None,
+        "min_date": None, "max_date": None, "min_due_date": None, "max_due_date": None,
+        "types": {}, "unpaid": 0, "unpaid_types": {},
+    }
+
+def track_row(meta, row):
+    # Folds one row into its partition's metadata; readers use it to skip whole partitions
+    transaction_id = int(row['transaction_id'])
+    meta["rows"] += 1
+    meta["min_id"] = transaction_id if meta["min_id"] is None else min(meta["min_id"], transaction_id)
+    meta["max_id"] = transaction_id if meta["max_id"] is None else max(meta["max_id"], transaction_id)
+    for field, key in (('date', 'date'), ('due_date', 'due_date')):
+        value = row.get(field) or row['date']
+        meta[f"min_{key}"] = value if meta[f"min_{key}"] is None else min(meta[f"min_{key}"], value)
+        meta[f"max_{key}"] = value if meta[f"max_{key}"] is None else max(meta[f"max_{key}"], value)
+    meta["types"][row['type']] = meta["types"].get(row['type'], 0) + 1
+    if (row.get('payment_status') or 'Unpaid') != 'Paid':
+        meta["unpaid"] += 1
+        meta["unpaid_types"][row['type']] = meta["unpaid_types"].get(row['type'], 0) + 1
+
+class PartitionedLedgerStorage(CsvLedgerStorage):
+    # Raw transactions and the summary stay in CSV; processed rows live in one segment file per month
+    def __init__(self, raw_csv="example/transactions.csv", partition_dir="example/processed", summary_csv="example/monthly_summary.csv"):
+        super().__init__(raw_csv, None, summary_csv)
+        self.partition_dir = partition_dir
+        self.manifest_path = os.path.join(partition_dir, MANIFEST_NAME)
+        self.manifest = None
+        # Identity of the manifest file self.manifest was read from or last written as
+        self._manifest_stat = None
+
+    def processed_ids(self):
+        ids = set()
+        for month, meta in self._partitions():
+            for line in self._lines(meta):
+                ids.add(line.split(b",", 1)[0].decode())
+        return ids
+
+    def append_processed(self, rows):
+        deltas = {}
+        for row in rows:
+            add_row(deltas, row)
+        with self._locked():
+            self._append_partitions(rows)
+            self.apply_summary_deltas(deltas)
+
+    def iter_processed(self, types=None, payment_status=None, since=None):
+        for month, meta in self._partitions():
+            if since is not None and month < since:
+                continue
+            if not self._may_contain(meta, types, payment_status):
+                METRICS.inc("bookkeeper_partitions_skipped_total", 1, "Ledger partitions skipped from manifest metadata")
+                continue
+            METRICS.inc("bookkeeper_partitions_read_total", 1, "Ledger partitions read")
+            yield from self._read_partition(meta, types, payment_status)
+
+    def get_processed(self, transaction_id):
+        transaction_id = int(transaction_id)
+        for month, meta in self._partitions():
+            if meta["rows"] and meta["min_id"] <= transaction_id <= meta["max_id"]:
+                for row in self._read_partition(meta):
+                    if int(row['transaction_id']) == transaction_id:
+                        return row
+        return None
+
+    def set_payment_status(self, transaction_ids, payment_status):
+        wanted = sorted({int(transaction_id) for transaction_id in transaction_ids})
+        if not wanted:
+            return 0
+        wanted_set = set(wanted)
+        changed_rows = []
+        with self._locked():
+            manifest = self._load_manifest(locked=True)
+            for meta in manifest["partitions"].values():
+                if not meta["rows"]:
+                    continue
+                # Only partitions whose ID range holds one of the requested IDs are rewritten
+                position = bisect_left(wanted, meta["min_id"])
+                if position == len(wanted) or wanted[position] > meta["max_id"]:
+                    continue
+                changed_rows.extend(self._rewrite_partition(meta, wanted_set, payment_status))
+            self._write_manifest(manifest)
+            self.apply_summary_deltas(status_change_deltas(changed_rows, payment_status))
+        return len(changed_rows)
+
+    def _append_partitions(self, rows):
+        # Caller holds the lock, so the manifest reloaded here includes every other writer's segments
+        manifest = self._load_manifest(locked=True)
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(row['month'], []).append(row)
+        os.makedirs(self.partition_dir, exist_ok=True)
+        for month, month_rows in by_month.items():
+            meta = manifest["partitions"].setdefault(month, empty_partition(f"processed-{month}.csv"))
+            path = os.path.join(self.partition_dir, meta["file"])
+            self._append_rows(path, PROCESSED_FIELDS, month_rows)
+            for row in month_rows:
+                track_row(meta, row)
+            meta["bytes"] = os.path.getsize(path)
+        # Segments are fsynced first, so a manifest never describes rows that are not on disk
+        self._write_manifest(manifest)
+
+    def _rewrite_partition(self, meta, wanted, payment_status):
+        changed_rows = []
+        path = os.path.join(self.partition_dir, meta["file"])
+        with tempfile.NamedTemporaryFile('wb', dir=self.partition_dir, delete=False) as tmpfile:
+            tmpfile.write((",".join(PROCESSED_FIELDS) + "\r\n").encode())
+            for line in self._lines(meta):
+                # Untouched rows are copied as bytes; only the requested IDs are parsed and re-encoded
+                if int(line.split(b",", 1)[0]) not in wanted:
+                    tmpfile.write(line)
+                    continue
+                row = dict(zip(PROCESSED_FIELDS, next(csv.reader(io.StringIO(line.decode())))))
+                if row['payment_status'] == payment_status:
+                    tmpfile.write(line)
+                    continue
+                changed_rows.append(dict(row))
+                step = 1 if payment_status != 'Paid' else -1
+                meta["unpaid"] += step
+                meta["unpaid_types"][row['type']] = meta["unpaid_types"].get(row['type'], 0) + step
+                row['payment_status'] = payment_status
+                buffer = io.StringIO()
+                csv.writer(buffer).writerow([row[field] for field in PROCESSED_FIELDS])
+                tmpfile.write(buffer.getvalue().encode())
+            tmpfile.flush()
+            os.fsync(tmpfile.fileno())
+        os.replace(tmpfile.name, path)
+        meta["bytes"] = os.path.getsize(path)
+        return changed_rows
+
+    def _locked(self):
+        # Writers in every process and thread serialize on this lock around their manifest update
+        os.makedirs(self.partition_dir, exist_ok=True)
+        return file_lock(os.path.join(self.partition_dir, LOCK_NAME))
+
+    def _load_manifest(self, locked=False):
+        # Reloaded whenever the file changes, so long-running processes see partitions other processes write
+        stat = self._stat_manifest()
+        if self.manifest is not None and stat == self._manifest_stat:
+            return self.manifest
+        manifest = self._read_json(self.manifest_path) or {"version": 1, "partitions": {}}
+        stale = self._stale_partitions(manifest)
+        if not stale:
+            self.manifest, self._manifest_stat = manifest, stat
+            return manifest
+        if not locked:
+            # Either another process is between a segment append and its manifest write, or one crashed
+            # there; under the lock the first case has finished and only a real crash is left to repair
+            with self._locked():
+                return self._load_manifest(locked=True)
+        for meta in stale:
+            # A crash between a segment append and the manifest write; recount that segment
+            path = os.path.join(self.partition_dir, meta["file"])
+            meta.clear()
+            meta.update(self._scan_partition(path))
+        self._write_manifest(manifest)
+        return manifest
+
+    def _stale_partitions(self, manifest):
+        if os.path.isdir(self.partition_dir):
+            # A segment created right before a crash may be missing from the manifest altogether
+            listed = {meta["file"] for meta in manifest["partitions"].values()}
+            for name in os.listdir(self.partition_dir):
+                if name.startswith("processed-") and name.endswith(".csv") and name not in listed:
+                    manifest["partitions"][name[len("processed-"):-len(".csv")]] = empty_partition(name)
+        stale = []
+        for meta in manifest["partitions"].values():
+            path = os.path.join(self.partition_dir, meta["file"])
+            if (os.path.getsize(path) if os.path.isfile(path) else 0) != meta["bytes"]:
+                stale.append(meta)
+        return stale
+
+    def _write_manifest(self, manifest):
+        write_json_durably(self.manifest_path, manifest)
+        self.manifest, self._manifest_stat = manifest, self._stat_manifest()
+
+    def _stat_manifest(self):
+        # os.replace gives every write a new inode, so this changes even within one mtime tick
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _partitions(self):
+        return sorted(self._load_manifest()["partitions"].items())
+
+    def _scan_partition(self, path):
+        meta = empty_partition(os.path.basename(path))
+        if os.path.isfile(path):
+            for row in self._read_rows(path):
+                track_row(meta, row)
+            meta["bytes"] = os.path.getsize(path)
+        return meta
+
+    def _may_contain(self, meta, types, payment_status):
+        if payment_status == 'Unpaid':
+            counts = meta["unpaid_types"]
+        elif payment_status == 'Paid':
+            counts = {type_: count - meta["unpaid_types"].get(type_, 0) for type_, count in meta["types"].items()}
+        else:
+            counts = meta["types"]
+        if types is None:
+            return any(counts.values())
+        return any(counts.get(type_) for type_ in types)
+
+    def _lines(self, meta):
+        # Memory-maps a segment and yields its data lines; quoted fields may span lines, so those are joined up
+        path = os.path.join(self.partition_dir, meta["file"])
+        if not meta["rows"] or not os.path.isfile(path) or not os.path.getsize(path):
+            return
+        with open(path, mode='rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            mapped.readline()
+            for line in iter(mapped.readline, b""):
+                while line.count(b'"') % 2:
+                    more = mapped.readline()
+                    if not more:
+                        break
+                    line += more
+                yield line
+
+    def _read_partition(self, meta, types=None, payment_status=None):
+        status_suffix = f",{payment_status}".encode() if payment_status else None
+        type_markers = [f",{type_},".encode() for type_ in types] if types is not None else None
+        for line in self._lines(meta):
+            # Cheap byte checks first: payment_status is the last column and type a bare field,
+            # so most rows a report doesn't want are dropped without being parsed
+            if status_suffix is not None and not line.rstrip(b"\r\n").endswith(status_suffix):
+                continue
+            if type_markers is not None and not any(marker in line for marker in type_markers):
+                continue
+            row = dict(zip(PROCESSED_FIELDS, next(csv.reader(io.StringIO(line.decode())))))
+            if types is not None and row['type'] not in types:
+                continue
+            row['amount'] = Money.parse(row['amount'])
+            yield row
+
+    def _read_json(self, path):
+        if not os.path.isfile(path):
+            return None
+        with open(path, mode='r') as file:
+            return json.load(file)
+
+def partition_csv_ledger(storage, processed_csv="example/processed_transactions.csv", chunk_size=5000):
+    # Splits an existing single-file processed ledger into month segments, then rebuilds the summary
+    count = 0
+    chunk = []
+    for row in storage._read_rows(processed_csv):
+        row['due_date'] = row.get('due_date') or row['date']
+        row['payment_status'] = row.get('payment_status') or 'Unpaid'
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            with storage._locked():
+                storage._append_partitions(chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        with storage._locked():
+            storage._append_partitions(chunk)
+        count += len(chunk)
+    storage.rebuild_summary()
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description="Split a processed_transactions.csv ledger into monthly partitions.")
+    parser.add_argument("--raw", default="example/transactions.csv")
+    parser.add_argument("--processed", default="example/processed_transactions.csv")
+    parser.add_argument("--dir", default="example/processed")
+    parser.add_argument("--summary", default="example/monthly_summary.csv")
+    args = parser.parse_args()
+
+    storage = PartitionedLedgerStorage(args.raw, args.dir, args.summary)
+    count = partition_csv_ledger(storage, args.processed)
+    print(f"Partitioned {count} processed transaction(s) into {args.dir}")
+
+if __name__ == "__main__":
+    main()
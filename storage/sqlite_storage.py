@@ -0,0 +1,208 @@
+import sqlite3
+import threading
+from .base_storage import BaseLedgerStorage, PROCESSED_FIELDS
+from utils.metrics import METRICS
+from utils.money import Money
+from .summary import SUMMARY_FIELDS, TOTAL_FIELDS, add_row, status_change_deltas
+
+FETCH_SIZE = 1000
+# Amounts live in integer cents columns and come back out as Money under their usual field name
+PROCESSED_COLUMNS = [field if field != 'amount' else 'amount_cents' for field in PROCESSED_FIELDS]
+PROCESSED_SELECT = ', '.join(field if field != 'amount' else 'amount_cents AS amount' for field in PROCESSED_FIELDS)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    transaction_id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    description TEXT NOT NULL,
+    amount_cents INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS processed_transactions (
+    transaction_id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    description TEXT NOT NULL,
+    amount_cents INTEGER NOT NULL,
+    category TEXT,
+    type TEXT,
+    month TEXT,
+    due_date TEXT,
+    payment_status TEXT NOT NULL DEFAULT 'Unpaid'
+);
+CREATE TABLE IF NOT EXISTS monthly_summary (
+    month TEXT PRIMARY KEY,
+    accounts_payable INTEGER NOT NULL DEFAULT 0,
+    accounts_receivable INTEGER NOT NULL DEFAULT 0,
+    revenue INTEGER NOT NULL DEFAULT 0,
+    expenses INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_processed_type ON processed_transactions(type);
+CREATE INDEX IF NOT EXISTS idx_processed_payment_status ON processed_transactions(payment_status);
+CREATE INDEX IF NOT EXISTS idx_processed_due_date ON processed_transactions(due_date);
+"""
+
+class SqliteLedgerStorage(BaseLedgerStorage):
+    def __init__(self, db_path="example/ledger.db"):
+        self.db_path = db_path
+        # transaction_id is the INTEGER PRIMARY KEY, so lookups and max(id) walk the rowid B-tree
+        # Other processes may hold the write lock briefly; wait for it instead of failing
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def add_transaction(self, date, description, amount):
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO transactions (transaction_id, date, description, amount_cents) "
+                "VALUES ((SELECT COALESCE(MAX(transaction_id), 0) + 1 FROM transactions), ?, ?, ?)",
+                (date, description, Money.parse(amount).cents),
+            )
+            return cursor.lastrowid
+
+    def add_transactions(self, entries):
+        # One write transaction: SQLite's database lock keeps concurrent writers from reusing IDs
+        with self._lock, self.conn:
+            ids = []
+            for date, description, amount in entries:
+                cursor = self.conn.execute(
+                    "INSERT INTO transactions (transaction_id, date, description, amount_cents) "
+                    "VALUES ((SELECT COALESCE(MAX(transaction_id), 0) + 1 FROM transactions), ?, ?, ?)",
+                    (date, description, Money.parse(amount).cents),
+                )
+                ids.append(cursor.lastrowid)
+            return ids
+
+    def iter_transactions(self):
+        yield from self._query((
+            "SELECT transaction_id, date, description, amount_cents AS amount FROM transactions ORDER BY transaction_id"
+        ))
+
+    def tail_transactions(self, position=None):
+        # position is the last transaction_id seen; new rows are a range seek on the primary key
+        if position is None:
+            with self._lock:
+                return [], self.conn.execute("SELECT COALESCE(MAX(transaction_id), 0) FROM transactions").fetchone()[0]
+        rows = list(self._query(
+            "SELECT transaction_id, date, description, amount_cents AS amount FROM transactions "
+            "WHERE transaction_id > ? ORDER BY transaction_id",
+            (int(position),),
+        ))
+        return rows, int(rows[-1]['transaction_id']) if rows else int(position)
+
+    def iter_unprocessed_transactions(self, resume_after=None):
+        # IDs are scanned in order, so resuming is a range seek on the primary key
+        yield from self._query(
+            "SELECT t.transaction_id, t.date, t.description, t.amount_cents AS amount FROM transactions t "
+            "WHERE t.transaction_id > ? "
+            "AND NOT EXISTS (SELECT 1 FROM processed_transactions p WHERE p.transaction_id = t.transaction_id) "
+            "ORDER BY t.transaction_id",
+            (int(resume_after) if resume_after is not None else 0,),
+        )
+
+    def processed_ids(self):
+        with self._lock:
+            return {str(row[0]) for row in self.conn.execute("SELECT transaction_id FROM processed_transactions")}
+
+    def append_processed(self, rows):
+        deltas = {}
+        for row in rows:
+            add_row(deltas, row)
+        # Ledger rows and their summary deltas commit together
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f"INSERT INTO processed_transactions ({', '.join(PROCESSED_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in PROCESSED_COLUMNS)})",
+                (
+                    [int(row['transaction_id']), row['date'], row['description'], Money.parse(row['amount']).cents]
+                    + [row[field] for field in PROCESSED_FIELDS[4:]]
+                    for row in rows
+                ),
+            )
+            self._upsert_summary(deltas)
+
+    def iter_processed(self, types=None, payment_status=None, since=None):
+        clauses, params = [], []
+        if types is not None:
+            clauses.append(f"type IN ({', '.join('?' for _ in types)})")
+            params.extend(types)
+        if payment_status is not None:
+            clauses.append("payment_status = ?")
+            params.append(payment_status)
+        if since is not None:
+            clauses.append("month >= ?")
+            params.append(since)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        yield from self._query(
+            f"SELECT {PROCESSED_SELECT} FROM processed_transactions{where} ORDER BY transaction_id",
+            params,
+        )
+
+    def get_processed(self, transaction_id):
+        rows = list(self._query(
+            f"SELECT {PROCESSED_SELECT} FROM processed_transactions WHERE transaction_id = ?",
+            (int(transaction_id),),
+        ))
+        return rows[0] if rows else None
+
+    def set_payment_status(self, transaction_ids, payment_status):
+        with self._lock, self.conn:
+            changed_rows = []
+            for transaction_id in transaction_ids:
+                row = self.conn.execute(
+                    "SELECT amount_cents, type, month, payment_status FROM processed_transactions "
+                    "WHERE transaction_id = ? AND payment_status != ?",
+                    (int(transaction_id), payment_status),
+                ).fetchone()
+                if row is not None:
+                    changed_rows.append({
+                        'amount': Money.from_cents(row[0]), 'type': row[1], 'month': row[2], 'payment_status': row[3]
+                    })
+                    self.conn.execute(
+                        "UPDATE processed_transactions SET payment_status = ? WHERE transaction_id = ?",
+                        (payment_status, int(transaction_id)),
+                    )
+            self._upsert_summary(status_change_deltas(changed_rows, payment_status))
+            return len(changed_rows)
+
+    def load_summary(self):
+        with self._lock:
+            rows = self.conn.execute(f"SELECT {', '.join(SUMMARY_FIELDS[:-1])} FROM monthly_summary").fetchall()
+        return {row[0]: {field: Money.from_cents(value) for field, value in zip(TOTAL_FIELDS, row[1:])} for row in rows}
+
+    def apply_summary_deltas(self, deltas):
+        with self._lock, self.conn:
+            self._upsert_summary(deltas)
+
+    def replace_summary(self, summary):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM monthly_summary")
+            self._upsert_summary(summary)
+
+    def close(self):
+        self.conn.close()
+
+    def _upsert_summary(self, deltas):
+        # Caller holds the lock and the transaction; only the affected month rows are touched
+        with METRICS.span("summary_update", backend="sqlite"):
+            self.conn.executemany(
+                f"INSERT INTO monthly_summary ({', '.join(SUMMARY_FIELDS[:-1])}) VALUES (?, ?, ?, ?, ?) "
+                f"ON CONFLICT(month) DO UPDATE SET "
+                + ", ".join(f"{field} = {field} + excluded.{field}" for field in TOTAL_FIELDS),
+                ([month] + [Money.parse(totals[field]).cents for field in TOTAL_FIELDS] for month, totals in deltas.items()),
+            )
+
+    def _query(self, sql, params=()):
+        # Stream in chunks so large scans stay in bounded memory; the lock is only held per fetch
+        with self._lock:
+            cursor = self.conn.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                record = dict(zip(columns, row))
+                record['transaction_id'] = str(record['transaction_id'])
+                record['amount'] = Money.from_cents(record['amount'])
+                yield record
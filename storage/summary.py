@@ -0,0 +1,52 @@
+import csv
+import os
+import tempfile
+from utils.money import Money
+
+SUMMARY_FIELDS = ['month', 'accounts_payable', 'accounts_receivable', 'revenue', 'expenses', 'net_income']
+TOTAL_FIELDS = SUMMARY_FIELDS[1:-1]
+
+def summary_column(type_, payment_status):
+    # Open payables/receivables sit in AP/AR; once settled they count as realized expenses/revenue
+    if type_ == "Accounts Payable":
+        return "expenses" if payment_status == "Paid" else "accounts_payable"
+    if type_ == "Accounts Receivable":
+        return "revenue" if payment_status == "Paid" else "accounts_receivable"
+    if type_ == "Revenue":
+        return "revenue"
+    return "expenses"
+
+def empty_totals():
+    return {field: Money(0) for field in TOTAL_FIELDS}
+
+def add_row(deltas, row, sign=1, payment_status=None):
+    totals = deltas.setdefault(row['month'], empty_totals())
+    column = summary_column(row['type'], payment_status or row.get('payment_status') or 'Unpaid')
+    amount = Money.parse(row['amount'])
+    totals[column] += amount if sign > 0 else -amount
+    return deltas
+
+def status_change_deltas(rows, payment_status, deltas=None):
+    # Moves each row's amount from the column of its current status to the column of the new one
+    deltas = {} if deltas is None else deltas
+    for row in rows:
+        add_row(deltas, row, sign=-1)
+        add_row(deltas, row, payment_status=payment_status)
+    return deltas
+
+def net_income(totals):
+    return sum((totals[field] for field in TOTAL_FIELDS), Money(0))
+
+def write_summary_csv(path, summary):
+    directory = os.path.dirname(path) or "."
+    with tempfile.NamedTemporaryFile('w', dir=directory, delete=False, newline='') as tmpfile:
+        writer = csv.DictWriter(tmpfile, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        for month, totals in sorted(summary.items()):
+            row = {field: totals[field] for field in TOTAL_FIELDS}
+            row['month'] = month
+            row['net_income'] = net_income(totals)
+            writer.writerow(row)
+        tmpfile.flush()
+        os.fsync(tmpfile.fileno())
+    os.replace(tmpfile.name, path)
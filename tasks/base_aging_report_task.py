@@ -0,0 +1,38 @@
+from storage.csv_storage import CsvLedgerStorage
+from utils.aging_engine import AgingEngine, DEFAULT_BOUNDARIES, aging_types
+
+REPORT_TITLES = {
+    "AR": "Accounts Receivable",
+    "AP": "Accounts Payable",
+}
+
+class BaseAgingReportTask:
+    REPORTS = ()
+    RESULT_MESSAGE = ""
+
+    def __init__(self, csv_file="example/processed_transactions.csv", storage=None, boundaries=DEFAULT_BOUNDARIES, top_n=10, engine="rows"):
+        self.storage = storage or CsvLedgerStorage(processed_csv=csv_file)
+        if engine == "rows":
+            self.engine = AgingEngine(boundaries, top_n)
+        elif engine == "columnar":
+            from utils.columnar_ledger import ColumnarAgingEngine
+            self.engine = ColumnarAgingEngine(boundaries, top_n)
+        else:
+            raise ValueError(f"Unsupported analytics engine: {engine}")
+
+    def execute(self):
+        # A single pass over the open items feeds every report this task produces
+        rows = self.storage.iter_processed(types=aging_types(self.REPORTS), payment_status="Unpaid")
+        results = self.engine.age(rows, reports=self.REPORTS)
+
+        for report in self.REPORTS:
+            print(f"\n====== {REPORT_TITLES[report]} Aging Report ======")
+            for bucket in results[report]:
+                print(f"\n{bucket.label}: {bucket.count} transaction(s) | Total: {bucket.total:.2f}")
+                top_items = bucket.top_items()
+                for description, due_date, amount in top_items:
+                    print(f"- {description} | Due: {due_date} | Amount: {amount}")
+                if bucket.count > len(top_items):
+                    print(f"  ... and {bucket.count - len(top_items)} more")
+
+        return self.RESULT_MESSAGE
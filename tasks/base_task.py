@@ -1,9 +1,187 @@
+import time
 from abc import ABC, abstractmethod
+from collections import Counter
+from utils.batch_response import parse_batch_response
+from utils.categorization_cache import get_model_name, hit_rate
+from utils.metrics import METRICS, estimate_tokens
+from utils.prompt_templates import CATEGORIZE_TEMPLATE, FALLBACK_LABEL
+from utils.resilient_model import ModelUnavailable
+
+LLM_LATENCY_HELP = "Model request latency; mode=batch times a whole concurrent batch"
 
 class BaseTask(ABC):
-    def __init__(self, model):
+    # Identifies the prompt template in cache keys; bump it whenever a task's prompt changes
+    PROMPT_VERSION = "base-v1"
+    # The task's PromptTemplate, by default the generic categorization one; labels overrides its closed label set
+    TEMPLATE = CATEGORIZE_TEMPLATE
+
+    def __init__(self, model, concurrency=1, cache=None, rules=None, batch_size=1, classifier=None, labels=None):
         self.model = model
+        self.template = self.TEMPLATE.with_labels(labels) if labels else self.TEMPLATE
+        self.prompt_version = f"{self.PROMPT_VERSION}-{self.template.version}"
+        self.concurrency = max(1, int(concurrency))
+        self.batch_size = max(1, int(batch_size))
+        self.cache = cache
+        self.rules = rules
+        self.classifier = classifier
+        self.path_counts = Counter()  # How many transactions each categorization path handled
+        self.cache_misses = 0  # Cache lookups this run that found nothing; not a path, so kept apart
 
     @abstractmethod
     def execute(self, *args, **kwargs):
         pass
+
+    def _cache_report(self):
+        # This run's cache lookups; `python -m utils.categorization_cache stats` shows the lifetime totals
+        if self.cache is None:
+            return None
+        hits = self.path_counts["cache"]
+        return f"Cache: {hits} hit(s), {self.cache_misses} miss(es) ({hit_rate(hits, self.cache_misses):.1%} hit rate)"
+
+    def _build_prompt(self, description, amount):
+        return self.template.render(description, amount)
+
+    def _build_batch_prompt(self, transactions):
+        # transactions is a list of (item_id, description, amount)
+        return self.template.render_batch(transactions)
+
+    def _clean_category(self, response):
+        return self.template.match_label(response)
+
+    def _invoke_prompts(self, prompts, options=None, prefix=""):
+        # Responses always come back in prompt order, whichever path is taken. A prompt the model
+        # could not answer (ModelUnavailable) comes back as None so its rows can be deferred
+        if not prompts:
+            return []
+        task = type(self).__name__
+        # Output caps and stop sequences from the template go with every call
+        options = options or {}
+        if self.concurrency <= 1 or len(prompts) <= 1:
+            responses = []
+            for prompt in prompts:
+                start = time.perf_counter()
+                try:
+                    responses.append(self.model.invoke(prompt, **options))
+                except ModelUnavailable:
+                    responses.append(None)
+                METRICS.observe("bookkeeper_llm_call_seconds", time.perf_counter() - start, LLM_LATENCY_HELP, task=task, mode="invoke")
+        else:
+            start = time.perf_counter()
+            responses = self.model.batch(prompts, config={"max_concurrency": self.concurrency}, return_exceptions=True, **options)
+            METRICS.observe("bookkeeper_llm_call_seconds", time.perf_counter() - start, LLM_LATENCY_HELP, task=task, mode="batch")
+            for position, response in enumerate(responses):
+                if isinstance(response, ModelUnavailable):
+                    responses[position] = None
+                elif isinstance(response, Exception):
+                    raise response
+        answered = [response for response in responses if response is not None]
+        METRICS.inc("bookkeeper_llm_calls_total", len(prompts), "Prompts sent to the model", task=task)
+        METRICS.inc("bookkeeper_llm_unanswered_total", len(prompts) - len(answered), "Prompts the model could not answer", task=task)
+        METRICS.inc("bookkeeper_llm_prompt_tokens_total", sum(estimate_tokens(prompt) for prompt in prompts),
+                    "Estimated prompt tokens (4 characters per token)", task=task)
+        if prefix:
+            METRICS.inc("bookkeeper_llm_prompt_prefix_tokens_total", estimate_tokens(prefix) * len(prompts),
+                        "Estimated prompt tokens in the static, provider-cacheable template prefix", task=task)
+        METRICS.inc("bookkeeper_llm_completion_tokens_total", sum(estimate_tokens(str(response)) for response in answered),
+                    "Estimated completion tokens (4 characters per token)", task=task)
+        return responses
+
+    def _categorize(self, transactions):
+        # transactions is a list of (description, amount). Returns (categories, sources): one category per
+        # entry, None where deferred, and the path that answered it ("rules", "cache", "similarity", "model")
+        categories = [None] * len(transactions)
+        sources = [None] * len(transactions)  # The path that answered each entry
+        misses = {}
+        paths = Counter()
+        model_name = get_model_name(self.model)
+
+        for index, (description, amount) in enumerate(transactions):
+            if self.rules is not None:
+                category = self.rules.match(description, amount)
+                if category is not None:
+                    categories[index] = category
+                    sources[index] = "rules"
+                    paths["rules"] += 1
+                    continue
+            if self.cache is not None:
+                key = self.cache.make_key(description, amount, self.prompt_version, model_name)
+                cached = self.cache.get(key)
+                # Older caches may hold the fallback label; that row deserves another model call
+                if cached is not None and cached != FALLBACK_LABEL:
+                    categories[index] = cached
+                    sources[index] = "cache"
+                    paths["cache"] += 1
+                    continue
+                self.cache_misses += 1
+            else:
+                key = index
+            if self.classifier is not None:
+                # Close enough to a description the ledger has already settled; no model call needed
+                category = self.classifier.classify(description, amount)
+                if category is not None:
+                    categories[index] = category
+                    sources[index] = "similarity"
+                    paths["similarity"] += 1
+                    continue
+            # Identical uncached transactions in one run share a single model call
+            misses.setdefault(key, []).append(index)
+
+        unique = [transactions[indices[0]] for indices in misses.values()]
+        labels = self._label_transactions(unique)
+
+        for (key, indices), category in zip(misses.items(), labels):
+            if not category:
+                # The model was unavailable or answered blank; these stay None for the caller to defer and are never cached
+                paths["deferred"] += len(indices)
+                continue
+            for index in indices:
+                categories[index] = category
+                sources[index] = "model"
+            paths["model"] += len(indices)
+            # The fallback label means the answer matched nothing; caching it would pin the row there
+            if self.cache is not None and category != FALLBACK_LABEL:
+                self.cache.put(key, category)
+
+        if self.cache is not None:
+            self.cache.save()
+        self.path_counts.update(paths)
+        for path, count in paths.items():
+            METRICS.inc("bookkeeper_categorizations_total", count, "Transactions categorized, by the path that answered",
+                        task=type(self).__name__, path=path)
+        return categories, sources
+
+    def _label_transactions(self, transactions):
+        labels = [None] * len(transactions)
+        pending = list(range(len(transactions)))
+
+        if self.batch_size > 1 and len(transactions) > 1:
+            chunks = [pending[start:start + self.batch_size] for start in range(0, len(pending), self.batch_size)]
+            prompts = [
+                self._build_batch_prompt([(position + 1, *transactions[index]) for position, index in enumerate(chunk)])
+                for chunk in chunks
+            ]
+            options, prefix = self.template.batch_options(self.batch_size), self.template.batch_prefix
+            for chunk, response in zip(chunks, self._invoke_prompts(prompts, options, prefix)):
+                if response is None:
+                    continue
+                answered = parse_batch_response(response, range(1, len(chunk) + 1))
+                for position, index in enumerate(chunk):
+                    label = answered.get(str(position + 1))
+                    if label is not None:
+                        labels[index] = self._clean_category(label)
+            # Malformed or partial batches fall back to one prompt per missing transaction
+            pending = [index for index in pending if not labels[index]]
+
+        prefix = self.template.prefix
+        responses = self._invoke_prompts([self._build_prompt(*transactions[index]) for index in pending], self.template.options(), prefix)
+        for index, response in zip(pending, responses):
+            if response is not None:
+                labels[index] = self._clean_category(response)
+        # Answered but blank: the reply began with a newline and the stop sequence cut it there. Ask
+        # once more without the stop; whatever is still blank stays None and is deferred
+        blank = [index for index, response in zip(pending, responses) if response is not None and not labels[index]]
+        responses = self._invoke_prompts([self._build_prompt(*transactions[index]) for index in blank], self.template.options(stop=False), prefix)
+        for index, response in zip(blank, responses):
+            if response is not None:
+                labels[index] = self._clean_category(response)
+        return labels
@@ -2,32 +2,32 @@ import csv
 import tempfile
 import shutil
 from .base_task import BaseTask
+from utils.prompt_templates import CATEGORIZE_TEMPLATE
 
 class CategorizeTransactionTask(BaseTask):
-    def __init__(self, model, csv_file_path="example/real_transactions.csv"):
-        super().__init__(model)
+    PROMPT_VERSION = "categorize-v2"
+    TEMPLATE = CATEGORIZE_TEMPLATE
+
+    def __init__(self, model, csv_file_path="example/real_transactions.csv", concurrency=1, cache=None, batch_size=1, labels=None):
+        super().__init__(model, concurrency=concurrency, cache=cache, batch_size=batch_size, labels=labels)
         self.csv_file_path = csv_file_path
 
     def execute(self):
-        updated_rows = []
+        self.path_counts.clear()
+        self.cache_misses = 0
         with open(self.csv_file_path, mode='r') as file:
             reader = csv.DictReader(file)
-            for row in reader:
-                if row['category'] == "Uncategorized":
-                    prompt = (
-                        f"Categorize this transaction for a SaaS company:\n"
-                        f"Transaction description: '{row['description']}'\n"
-                        f"Transaction amount: {row['amount']}\n"
-                        f"\n"
-                        f"Instructions:\n"
-                        f"- Only respond with a short category label like 'Hosting Expenses', 'Subscription Revenue', 'Software Subscriptions', etc.\n"
-                        f"- Do not explain, do not use markdown, do not add extra text.\n"
-                        f"- Respond with JUST the category."
-                    )
-                    category = self.model.invoke(prompt)
-                    cleaned_category = category.strip().split("\n")[0]  # Take only first line
-                    row['category'] = cleaned_category
-                updated_rows.append(row)
+            updated_rows = list(reader)
+
+        uncategorized = [row for row in updated_rows if row['category'] == "Uncategorized"]
+        categories, _ = self._categorize([(row['description'], row['amount']) for row in uncategorized])
+        deferred = 0
+        for row, category in zip(uncategorized, categories):
+            if category is None:
+                # The model was unavailable or gave a blank answer; leave the row Uncategorized for the next run
+                deferred += 1
+                continue
+            row['category'] = category
 
         with tempfile.NamedTemporaryFile('w', delete=False, newline='') as tmpfile:
             fieldnames = ['date', 'description', 'amount', 'category']
@@ -36,4 +36,9 @@ class CategorizeTransactionTask(BaseTask):
             writer.writerows(updated_rows)
 
         shutil.move(tmpfile.name, self.csv_file_path)
+        cache_report = self._cache_report()
+        if cache_report:
+            print(cache_report)
+        if deferred:
+            print(f"{deferred} transaction(s) left Uncategorized because the model gave no answer.")
         return "Categorization complete!"
@@ -0,0 +1,5 @@
+from .base_aging_report_task import BaseAgingReportTask
+
+class GenerateAgingReportsTask(BaseAgingReportTask):
+    REPORTS = ("AR", "AP")
+    RESULT_MESSAGE = "AR and AP Aging reports generated successfully."
@@ -1,68 +1,79 @@
-import csv
-import tempfile
-import shutil
+from storage.csv_storage import CsvLedgerStorage
+from utils.settlement import DEFAULT_DATE_WINDOW, SettlementIndex, load_remittance
 
 class MarkTransactionPaidTask:
-    def __init__(self, csv_file="example/processed_transactions.csv"):
-        self.csv_file = csv_file
+    def __init__(self, csv_file="example/processed_transactions.csv", storage=None, date_window=DEFAULT_DATE_WINDOW):
+        self.storage = storage or CsvLedgerStorage(processed_csv=csv_file)
+        self.date_window = date_window
 
-    def execute(self):
-        transactions = []
+    def execute(self, transaction_id=None, interactive=True, transaction_ids=None, remittance_file=None):
+        if transaction_ids or remittance_file:
+            return self._settle(transaction_ids or [], remittance_file)
 
-        # Load unpaid transactions safely
-        with open(self.csv_file, mode='r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                if row.get('payment_status', 'Unpaid') != "Paid":
-                    transactions.append(row)
+        if transaction_id is not None:
+            selected_txn = self.storage.get_processed(transaction_id)
+            if selected_txn is None:
+                raise ValueError(f"Unknown transaction_id: {transaction_id}")
+            if selected_txn['payment_status'] == "Paid":
+                return f"Transaction {transaction_id} is already Paid."
+        elif not interactive:
+            raise ValueError("transaction_id is required when not running interactively")
+        else:
+            selected_txn = self._choose_unpaid_transaction()
+            if selected_txn is None:
+                return
+
+        # Match on transaction_id so duplicate (date, description, amount) rows are left alone
+        self.storage.set_payment_status([selected_txn['transaction_id']], "Paid")
+
+        print(f"\nMarked '{selected_txn['description']}' as Paid successfully!")
+        return "Transaction update complete."
+
+    def _settle(self, transaction_ids, remittance_file):
+        items = [{'line': None, 'transaction_id': str(transaction_id).strip(), 'amount': '', 'date': '', 'reference': ''}
+                 for transaction_id in transaction_ids]
+        if remittance_file:
+            items.extend(load_remittance(remittance_file))
+
+        index = SettlementIndex(self.storage.iter_processed(), self.date_window)
+        results = index.match(items)
+        # Every status change lands in a single rewrite of the ledger
+        settled = self.storage.set_payment_status(index.settled_ids(results), "Paid")
+
+        print("\n===== Settlement Report =====")
+        for item, status, row in results:
+            source = f"line {item['line']}" if item['line'] else f"id {item['transaction_id']}"
+            if row is not None:
+                print(f"{source}: {status} -> [{row['transaction_id']}] {row['date']} | {row['description']} | {row['amount']}")
+            elif item['transaction_id']:
+                print(f"{source}: {status}")
+            else:
+                print(f"{source}: {status} ({item['date']} | {item['amount']} | {item['reference']})")
+
+        counts = {}
+        for _, status, _ in results:
+            counts[status] = counts.get(status, 0) + 1
+        breakdown = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+        return f"Settled {settled} of {len(results)} item(s) ({breakdown})."
+
+    def _choose_unpaid_transaction(self):
+        transactions = list(self.storage.iter_processed(payment_status="Unpaid"))
 
         if not transactions:
             print("No unpaid transactions found.")
-            return
+            return None
 
         print("\n===== Unpaid Transactions =====")
         for idx, txn in enumerate(transactions, start=1):
-            print(f"[{idx}] {txn['date']} | {txn['description']} | {txn['amount']} | Type: {txn['type']} | Due: {txn.get('due_date', txn['date'])}")
+            print(f"[{idx}] {txn['date']} | {txn['description']} | {txn['amount']} | Type: {txn['type']} | Due: {txn['due_date']}")
 
         try:
             choice = int(input("\nEnter the number of the transaction to mark as Paid: "))
             if not (1 <= choice <= len(transactions)):
                 print("Invalid choice.")
-                return
+                return None
         except ValueError:
             print("Invalid input. Please enter a number.")
-            return
-
-        selected_txn = transactions[choice - 1]
-
-        # Rewrite file, updating payment_status
-        temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, newline='')
-        with open(self.csv_file, mode='r') as file, temp_file:
-            reader = csv.DictReader(file)
-            # Dynamically update fieldnames
-            fieldnames = reader.fieldnames.copy()
-            if 'due_date' not in fieldnames:
-                fieldnames.append('due_date')
-            if 'payment_status' not in fieldnames:
-                fieldnames.append('payment_status')
-
-            writer = csv.DictWriter(temp_file, fieldnames=fieldnames)
-            writer.writeheader()
-
-            for row in reader:
-                # Ensure every row has required fields
-                if 'due_date' not in row:
-                    row['due_date'] = row.get('date', '')  # fallback
-                if 'payment_status' not in row:
-                    row['payment_status'] = 'Unpaid'
+            return None
 
-                if (row['date'] == selected_txn['date'] and
-                    row['description'] == selected_txn['description'] and
-                    row['amount'] == selected_txn['amount']):
-                    row['payment_status'] = "Paid"
-                writer.writerow(row)
-
-        shutil.move(temp_file.name, self.csv_file)
-
-        print(f"\nMarked '{selected_txn['description']}' as Paid successfully!")
-        return "Transaction update complete."
+        return transactions[choice - 1]
@@ -0,0 +1,105 @@
+import contextlib
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from storage.summary import TOTAL_FIELDS, empty_totals, net_income, write_summary_csv
+from utils.entity_loader import entity_config, load_entities
+from utils.resilient_model import TokenBucket
+
+# Set in each pool process by _init_worker
+_worker = {}
+
+def _init_worker(config, rate_limiter):
+    _worker["config"] = config
+    _worker["rate_limiter"] = rate_limiter
+
+def _process_entity(entity):
+    # Runs in a pool process: the entity gets its own storage, cache, checkpoint and history index,
+    # while every process's model draws on the one shared request budget
+    from storage.checkpoint import IngestCheckpoint
+    from tasks.process_transactions_task import ProcessTransactionsTask
+    from utils.categorization_cache import load_cache
+    from utils.model_loader import LazyModel, load_model
+    from utils.prompt_templates import parse_labels
+    from utils.rule_engine import load_rules
+    from utils.similarity_classifier import load_classifier
+    from utils.storage_loader import load_storage
+
+    config = entity_config(_worker["config"], entity)
+    model = LazyModel(config, loader=partial(load_model, rate_limiter=_worker["rate_limiter"]))
+    storage = load_storage(config)
+    try:
+        task = ProcessTransactionsTask(
+            model, concurrency=config["CATEGORIZATION_CONCURRENCY"], cache=load_cache(config),
+            rules=load_rules(config["CATEGORY_RULES_PATH"]), batch_size=config["CATEGORIZATION_BATCH_SIZE"],
+            storage=storage, chunk_size=config["INGEST_CHUNK_SIZE"],
+            checkpoint=IngestCheckpoint(config["INGEST_CHECKPOINT_PATH"]),
+            retry_rounds=config["RETRY_QUEUE_ROUNDS"], classifier=load_classifier(config, storage),
+            labels=parse_labels(config["CATEGORY_LABELS"])
+        )
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            task.execute()
+        # Only the per-month totals travel back to the parent, never the ledger rows
+        return {"output": output.getvalue(), "summary": storage.load_summary()}
+    finally:
+        storage.close()
+
+class ProcessEntitiesTask:
+    def __init__(self, config, entities_path="example/entities", workers=4, output_csv="example/consolidated_summary.csv"):
+        self.config = config
+        self.entities_path = entities_path
+        self.workers = workers
+        self.output_csv = output_csv
+
+    def execute(self, source=None, workers=None, output=None):
+        entities = load_entities(source or self.entities_path)
+        workers = max(1, min(int(workers or self.workers), len(entities)))
+        output_csv = output or self.output_csv
+
+        print(f"Processing {len(entities)} entity ledger(s) with {workers} worker process(es)...")
+        results, failures = {}, {}
+        # spawn, not fork: the agent may be running inside the threaded HTTP service
+        context = multiprocessing.get_context("spawn")
+        rate_limiter = TokenBucket(self.config["LLM_REQUESTS_PER_MINUTE"], self.config["LLM_RATE_BURST"], context=context)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(self.config, rate_limiter)) as executor:
+            futures = {executor.submit(_process_entity, entity): entity["name"] for entity in entities}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as error:
+                    failures[name] = error
+                    print(f"\n[{name}] failed: {error}")
+                    continue
+                print(f"\n====== Entity: {name} ======")
+                print(results[name]["output"].rstrip())
+
+        consolidated = {}
+        for result in results.values():
+            for month, totals in result["summary"].items():
+                stored = consolidated.setdefault(month, empty_totals())
+                for field in TOTAL_FIELDS:
+                    stored[field] += totals[field]
+        if consolidated:
+            os.makedirs(os.path.dirname(output_csv) or ".", exist_ok=True)
+            write_summary_csv(output_csv, consolidated)
+
+        print("\n====== Consolidated Monthly Summary ======")
+        for month, totals in sorted(consolidated.items()):
+            print(f"\nMonth: {month}")
+            print(f"  Accounts Payable: {totals['accounts_payable']:.2f}")
+            print(f"  Accounts Receivable: {totals['accounts_receivable']:.2f}")
+            print(f"  Revenue: {totals['revenue']:.2f}")
+            print(f"  Expenses: {totals['expenses']:.2f}")
+            print(f"  Net Income: {net_income(totals):.2f}")
+
+        message = f"\nProcessed {len(results)} of {len(entities)} entity ledger(s)"
+        if consolidated:
+            message += f"; consolidated summary written to {output_csv}"
+        if failures:
+            message += f". Failed: {', '.join(sorted(failures))}"
+        return message + "."
@@ -1,101 +1,63 @@
-import csv
-import os
-import shutil
-import tempfile
+import time
 from datetime import datetime, timedelta
 from .base_task import BaseTask
-import re
+from storage.csv_storage import CsvLedgerStorage
+from utils.metrics import METRICS
+from utils.money import Money
+from utils.prompt_templates import PROCESS_TEMPLATE
+
+# Categorization paths whose answers the similarity index may learn from
+CONFIRMED_SOURCES = frozenset({"rules", "model"})
 
 class ProcessTransactionsTask(BaseTask):
-    def __init__(self, model, raw_csv="example/transactions.csv", processed_csv="example/processed_transactions.csv", summary_csv="example/monthly_summary.csv"):
-        super().__init__(model)
-        self.raw_csv = raw_csv
-        self.processed_csv = processed_csv
-        self.summary_csv = summary_csv
+    PROMPT_VERSION = "process-v3"
+    TEMPLATE = PROCESS_TEMPLATE
+
+    def __init__(self, model, raw_csv="example/transactions.csv", processed_csv="example/processed_transactions.csv", summary_csv="example/monthly_summary.csv", concurrency=1, cache=None, rules=None, batch_size=1, storage=None, chunk_size=500, checkpoint=None, retry_rounds=2, classifier=None, labels=None):
+        super().__init__(model, concurrency=concurrency, cache=cache, rules=rules, batch_size=batch_size, classifier=classifier, labels=labels)
+        self.storage = storage or CsvLedgerStorage(raw_csv, processed_csv, summary_csv)
+        self.chunk_size = max(1, int(chunk_size))
+        self.checkpoint = checkpoint
+        self.retry_rounds = max(0, int(retry_rounds))
 
     def execute(self):
-        processed_ids = self._load_processed_ids()
-        new_processed_rows = []
+        self.path_counts.clear()
+        self.cache_misses = 0
         summary = {}
-
-        with open(self.raw_csv, mode='r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                transaction_id = row['transaction_id']
-
-                if transaction_id in processed_ids:
-                    continue  # Already processed
-
-                date = row['date']
-                description = row['description']
-                amount = float(row['amount'])
-                month = datetime.strptime(date, "%Y-%m-%d").strftime("%Y-%m")
-
-                # Categorize
-                prompt = (
-                    f"You are a professional bookkeeper categorizing financial transactions for a SaaS startup.\n"
-                    f"Transaction Description: '{description}'\n"
-                    f"Transaction Amount: {amount}\n\n"
-                    f"Categorization Instructions:\n"
-                    f"- If the description mentions 'Stripe', treat it as 'Revenue' (not Accounts Receivable).\n"
-                    f"- If the description includes 'invoice', 'payment from customer', or similar, treat as 'Subscription Revenue' under Accounts Receivable.\n"
-                    f"- If the amount is negative and description mentions 'consulting', 'contractor', or 'services', treat as 'Professional Services' under Accounts Payable.\n"
-                    f"- If the amount is negative and description includes 'rent', 'subscription', 'domain', 'hosting', 'software', treat as 'Operating Expenses' under Accounts Payable.\n"
-                    f"- Otherwise, categorize with the best fitting label.\n"
-                    f"- Only respond with the CATEGORY LABEL, no explanations, no quotes.\n"
-                    f"- Examples of valid outputs: 'Subscription Revenue', 'Revenue', 'Professional Services', 'Office Expenses', 'Hosting Expenses'."
-                )
-                category = self.model.invoke(prompt).strip().split("\n")[0]
-                category = re.sub(r'[\"\']', '', category).strip().title()
-
-                # Determine type
-                if amount < 0:
-                    if "Expense" in category or "Services" in category:
-                        type_ = "Accounts Payable"
-                    else:
-                        type_ = "Expense"
-                else:
-                    if "Revenue" in category:
-                        type_ = "Revenue"
-                    else:
-                        type_ = "Accounts Receivable"
-
-                # NEW: Set due_date properly
-                txn_date_obj = datetime.strptime(date, "%Y-%m-%d")
-                if "invoice" in description.lower():
-                    due_date_obj = txn_date_obj + timedelta(days=30)
-                else:
-                    due_date_obj = txn_date_obj  # same day
-
-                due_date = due_date_obj.strftime("%Y-%m-%d")
-
-                new_processed_rows.append({
-                    "transaction_id": transaction_id,
-                    "date": date,
-                    "description": description,
-                    "amount": amount,
-                    "category": category,
-                    "type": type_,
-                    "month": month,
-                    "due_date": due_date,
-                    "payment_status": "Unpaid"
-                })
-
-                # Update monthly summary
-                if month not in summary:
-                    summary[month] = {
-                        "Accounts Payable": 0,
-                        "Accounts Receivable": 0,
-                        "Revenue": 0,
-                        "Expense": 0
-                    }
-                summary[month][type_] += amount
-
-        # Append new processed rows to file
-        self._append_processed(new_processed_rows)
-
-        # Update monthly summary
-        self._write_summary(summary)
+        processed_count = 0
+        retry_queue = []
+
+        resume_after = self.checkpoint.last_transaction_id() if self.checkpoint else None
+        if resume_after is not None:
+            print(f"Resuming after transaction {resume_after} (last committed checkpoint).")
+
+        # Rows are categorized and committed chunk by chunk, so an interrupted import keeps
+        # everything up to its last checkpoint and never pays for those model calls again
+        chunks = self._chunks(self.storage.iter_unprocessed_transactions(resume_after))
+        while True:
+            with METRICS.span("read", task="process_transactions"):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            with METRICS.span("categorize", task="process_transactions"):
+                new_processed_rows, deferred_rows, confirmed_rows = self._process_chunk(chunk, summary)
+            if new_processed_rows:
+                with METRICS.span("write", task="process_transactions"):
+                    self._append(new_processed_rows, confirmed_rows)
+            if self.checkpoint:
+                with METRICS.span("checkpoint", task="process_transactions"):
+                    self._commit_checkpoint(chunk, deferred_rows, retry_queue)
+            retry_queue.extend(deferred_rows)
+            processed_count += len(new_processed_rows)
+
+        retried_count = self._drain_retry_queue(retry_queue, summary)
+        processed_count += retried_count
+        if self.checkpoint and not retry_queue:
+            # The run finished with nothing left over, so there is nothing to resume. Keeping the ID
+            # would make a later run against a replaced or re-sorted ledger skip every row before it
+            self.checkpoint.clear()
+        if self.classifier is not None:
+            self.classifier.save()
 
         print("\n====== Monthly Financial Summary ======")
         for month, totals in summary.items():
@@ -107,78 +69,155 @@ class ProcessTransactionsTask(BaseTask):
             print(f"  Total Expenses: {totals['Expense']:.2f}")
             print(f"  Net Income: {net_income:.2f}")
 
+        print(
+            f"\nCategorized {processed_count} transaction(s): "
+            f"{self.path_counts['rules']} by rules, {self.path_counts['cache']} from cache, "
+            f"{self.path_counts['similarity']} by ledger history, {self.path_counts['model']} by the model"
+        )
+        cache_report = self._cache_report()
+        if cache_report:
+            print(cache_report)
+        if retry_queue:
+            print(
+                f"{len(retry_queue)} transaction(s) deferred because the model gave no answer. "
+                f"They remain unprocessed and the next run retries them."
+            )
+
         return "\nProcessing complete."
 
-    def _load_processed_ids(self):
-        ids = set()
-        if not os.path.isfile(self.processed_csv):
-            return ids
-        with open(self.processed_csv, mode='r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                if 'transaction_id' in row:
-                    ids.add(row['transaction_id'])
-        return ids
-
-    def _append_processed(self, new_rows):
-        file_exists = os.path.isfile(self.processed_csv)
-        with open(self.processed_csv, mode='a', newline='') as file:
-            fieldnames = ['transaction_id', 'date', 'description', 'amount', 'category', 'type', 'month', 'due_date', 'payment_status']
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-
-            if not file_exists:
-                writer.writeheader()
-
-            writer.writerows(new_rows)
-
-    def _write_summary(self, summary):
-        existing_summary = {}
-
-        # Load existing monthly summaries if file exists
-        if os.path.isfile(self.summary_csv):
-            with open(self.summary_csv, mode='r') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    existing_summary[row['month']] = {
-                        'accounts_payable': float(row['accounts_payable']),
-                        'accounts_receivable': float(row['accounts_receivable']),
-                        'revenue': float(row['revenue']),
-                        'expenses': float(row['expenses']),
-                        'net_income': float(row['net_income'])
-                    }
-
-        # Merge new summary into existing summary
-        for month, totals in summary.items():
-            if month not in existing_summary:
-                existing_summary[month] = {
-                    'accounts_payable': 0.0,
-                    'accounts_receivable': 0.0,
-                    'revenue': 0.0,
-                    'expenses': 0.0,
-                    'net_income': 0.0
+    def process_rows(self, rows):
+        # Categorizes and posts just these raw rows, without scanning the ledger for unprocessed ones.
+        # Returns (posted rows, deferred rows); the caller decides what to do with the deferred ones.
+        # The ingest checkpoint is left alone: a later full run skips these rows by their processed IDs
+        posted, deferred = [], []
+        for chunk in self._chunks(rows):
+            new_processed_rows, deferred_rows, confirmed_rows = self._process_chunk(chunk, {})
+            if new_processed_rows:
+                self._append(new_processed_rows, confirmed_rows)
+            posted.extend(new_processed_rows)
+            deferred.extend(deferred_rows)
+        if self.classifier is not None:
+            self.classifier.save()
+        return posted, deferred
+
+    def _append(self, rows, confirmed_rows):
+        if self.classifier is not None:
+            # Rows the rules or the model categorized become history the next lookups can match against;
+            # the classifier's own answers are left out so a wrong match can't vote for itself. Learned
+            # before the append so a first-use seed from the ledger can't count these rows twice
+            self.classifier.add(confirmed_rows)
+        self.storage.append_processed(rows)
+
+    def _commit_checkpoint(self, chunk, deferred_rows, retry_queue):
+        # Once a row is deferred the checkpoint stops just before it, so a restart re-reads it;
+        # rows processed after it are skipped on resume by the processed-ID check instead
+        if retry_queue:
+            return
+        if not deferred_rows:
+            self.checkpoint.commit(chunk[-1]['transaction_id'], len(chunk))
+            return
+        position = next(index for index, row in enumerate(chunk) if row is deferred_rows[0])
+        if position:
+            self.checkpoint.commit(chunk[position - 1]['transaction_id'], position)
+
+    def _drain_retry_queue(self, retry_queue, summary):
+        # Deferred rows get a few more tries once the model's circuit breaker lets requests through
+        retried_count = 0
+        for _ in range(self.retry_rounds):
+            if not retry_queue:
+                break
+            available_in = getattr(self.model, "available_in", None)
+            delay = available_in() if available_in else 0
+            if delay:
+                print(f"Retrying {len(retry_queue)} deferred transaction(s) in {delay:.0f}s.")
+                time.sleep(delay)
+            pending = list(retry_queue)
+            retry_queue.clear()
+            for chunk in self._chunks(pending):
+                new_processed_rows, deferred_rows, confirmed_rows = self._process_chunk(chunk, summary)
+                if new_processed_rows:
+                    self._append(new_processed_rows, confirmed_rows)
+                retry_queue.extend(deferred_rows)
+                retried_count += len(new_processed_rows)
+        return retried_count
+
+    def _process_chunk(self, pending_rows, summary):
+        # Returns (processed rows, deferred rows, confirmed rows); rows the model could not categorize
+        # are deferred, and confirmed rows are the processed ones the rules or the model categorized
+        new_processed_rows = []
+        deferred_rows = []
+        confirmed_rows = []
+
+        # Categorize the whole chunk at once so the model calls can run concurrently.
+        # Amounts are parsed once here and carried as integer cents from then on
+        for row in pending_rows:
+            row['amount'] = Money.parse(row['amount'])
+        categories, sources = self._categorize([(row['description'], row['amount']) for row in pending_rows])
+
+        for row, category, source in zip(pending_rows, categories, sources):
+            if category is None:
+                deferred_rows.append(row)
+                continue
+            transaction_id = row['transaction_id']
+            date = row['date']
+            description = row['description']
+            amount = row['amount']
+            month = datetime.strptime(date, "%Y-%m-%d").strftime("%Y-%m")
+
+            # Determine type
+            if amount < 0:
+                if "Expense" in category or "Services" in category:
+                    type_ = "Accounts Payable"
+                else:
+                    type_ = "Expense"
+            else:
+                if "Revenue" in category:
+                    type_ = "Revenue"
+                else:
+                    type_ = "Accounts Receivable"
+
+            # NEW: Set due_date properly
+            txn_date_obj = datetime.strptime(date, "%Y-%m-%d")
+            if "invoice" in description.lower():
+                due_date_obj = txn_date_obj + timedelta(days=30)
+            else:
+                due_date_obj = txn_date_obj  # same day
+
+            due_date = due_date_obj.strftime("%Y-%m-%d")
+
+            processed_row = {
+                "transaction_id": transaction_id,
+                "date": date,
+                "description": description,
+                "amount": amount,
+                "category": category,
+                "type": type_,
+                "month": month,
+                "due_date": due_date,
+                "payment_status": "Unpaid"
+            }
+            new_processed_rows.append(processed_row)
+            if source in CONFIRMED_SOURCES:
+                confirmed_rows.append(processed_row)
+
+            # Tally this run's monthly totals for the report below
+            if month not in summary:
+                summary[month] = {
+                    "Accounts Payable": Money(0),
+                    "Accounts Receivable": Money(0),
+                    "Revenue": Money(0),
+                    "Expense": Money(0)
                 }
-
-            existing_summary[month]['accounts_payable'] += totals['Accounts Payable']
-            existing_summary[month]['accounts_receivable'] += totals['Accounts Receivable']
-            existing_summary[month]['revenue'] += totals['Revenue']
-            existing_summary[month]['expenses'] += totals['Expense']
-            existing_summary[month]['net_income'] = (
-                existing_summary[month]['revenue'] + existing_summary[month]['accounts_receivable']
-                + existing_summary[month]['expenses'] + existing_summary[month]['accounts_payable']
-            )
-
-        # Rewrite the summary file
-        with open(self.summary_csv, mode='w', newline='') as file:
-            fieldnames = ['month', 'accounts_payable', 'accounts_receivable', 'revenue', 'expenses', 'net_income']
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            writer.writeheader()
-
-            for month, totals in sorted(existing_summary.items()):
-                writer.writerow({
-                    'month': month,
-                    'accounts_payable': f"{totals['accounts_payable']:.2f}",
-                    'accounts_receivable': f"{totals['accounts_receivable']:.2f}",
-                    'revenue': f"{totals['revenue']:.2f}",
-                    'expenses': f"{totals['expenses']:.2f}",
-                    'net_income': f"{totals['net_income']:.2f}"
-                })
+            summary[month][type_] += amount
+
+        return new_processed_rows, deferred_rows, confirmed_rows
+
+    def _chunks(self, rows):
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
@@ -0,0 +1,20 @@
+from storage.csv_storage import CsvLedgerStorage
+
+class VerifySummaryTask:
+    def __init__(self, storage=None):
+        self.storage = storage or CsvLedgerStorage()
+
+    def execute(self, rebuild=False):
+        # One streaming pass over the processed ledger, compared against the stored monthly totals
+        discrepancies = self.storage.verify_summary()
+
+        print("\n====== Monthly Summary Verification ======")
+        if not discrepancies:
+            print("Monthly summary matches the processed ledger.")
+        for month, field, stored, expected in discrepancies:
+            print(f"- {month} {field}: stored {stored:.2f}, ledger {expected:.2f}")
+
+        if rebuild and discrepancies:
+            self.storage.rebuild_summary()
+            return f"Rebuilt monthly summary ({len(discrepancies)} discrepancy(ies) fixed)."
+        return f"Verification complete: {len(discrepancies)} discrepancy(ies) found."
@@ -0,0 +1,34 @@
+import re
+from storage.csv_storage import CsvLedgerStorage
+from storage.summary import net_income
+
+class ViewStatusTask:
+    def __init__(self, storage=None, engine="rows"):
+        self.storage = storage or CsvLedgerStorage()
+        if engine not in ("rows", "columnar"):
+            raise ValueError(f"Unsupported analytics engine: {engine}")
+        self.engine = engine
+
+    def execute(self, since=None):
+        # since ("YYYY-MM") limits the report to recent months; partitioned ledgers then skip older segments
+        if since is not None and not re.fullmatch(r"\d{4}-\d{2}", since):
+            raise ValueError(f"Invalid month: {since!r} (expected YYYY-MM)")
+        if self.engine == "columnar":
+            from utils.columnar_ledger import ColumnarLedger
+            summary = ColumnarLedger(self.storage.iter_processed(since=since)).monthly_summary()
+        else:
+            summary = self.storage.load_summary()
+            if since is not None:
+                summary = {month: totals for month, totals in summary.items() if month >= since}
+        if not summary:
+            print("No summary available yet.")
+            return
+
+        print("\n====== Current Financial Status ======")
+        for month, totals in sorted(summary.items()):
+            print(f"\nMonth: {month}")
+            print(f"  Accounts Payable: {totals['accounts_payable']:.2f}")
+            print(f"  Accounts Receivable: {totals['accounts_receivable']:.2f}")
+            print(f"  Revenue: {totals['revenue']:.2f}")
+            print(f"  Expenses: {totals['expenses']:.2f}")
+            print(f"  Net Income: {net_income(totals):.2f}")
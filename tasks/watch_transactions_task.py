@@ -0,0 +1,123 @@
+import csv
+import os
+import time
+from datetime import datetime
+from storage.checkpoint import WatchState
+from utils.metrics import METRICS
+from utils.money import Money
+
+class WatchTransactionsTask:
+    def __init__(self, process_task, storage, state_path="example/watch_state.json", interval=0.2, drop_dir=""):
+        self.process_task = process_task
+        self.storage = storage
+        self.state = WatchState(state_path)
+        self.interval = interval
+        self.drop_dir = drop_dir
+        # Processed IDs loaded after an unclean stop; the first poll skips rows already posted
+        self._already_posted = None
+
+    def execute(self, interval=None, drop_dir=None, once=False):
+        interval = self.interval if interval is None else float(interval)
+        drop_dir = self.drop_dir if drop_dir is None else drop_dir
+        if interval <= 0:
+            raise ValueError("Watch interval must be positive")
+        position, last_id, deferred = self._start()
+
+        where = getattr(self.storage, "raw_csv", "the ledger") + (f" and {drop_dir}" if drop_dir else "")
+        if not once:
+            print(f"Watching {where} every {interval:g}s (Ctrl+C to stop).")
+        total = 0
+        try:
+            while True:
+                started = time.monotonic()
+                if drop_dir:
+                    self._ingest_drop_dir(drop_dir)
+                position, last_id, deferred, posted = self._poll(position, last_id, deferred)
+                total += posted
+                if once:
+                    break
+                # Polling a file's size is cheap; sleeping only the rest of the interval keeps latency bounded
+                time.sleep(max(0.0, interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            print("\nStopped watching.")
+        return f"Watch mode posted {total} transaction(s)."
+
+    def _start(self):
+        state = self.state.load()
+        if state is not None:
+            if state.get('in_flight'):
+                # Stopped while posting: some of the rows it was handling may already be in the ledger
+                self._already_posted = self.storage.processed_ids()
+            deferred = [dict(row, amount=Money.parse(row['amount'])) for row in state.get('deferred', [])]
+            return state['position'], state.get('last_transaction_id'), deferred
+
+        # First run: take the end of the ledger before catching up, so nothing appended meanwhile
+        # is missed; rows the catch-up already posted are skipped by the last-ID check
+        _, position = self.storage.tail_transactions(None)
+        print("No watch state yet; catching up with a full processing run first.")
+        print(self.process_task.execute())
+        ids = [int(transaction_id) for transaction_id in self.storage.processed_ids()]
+        last_id = str(max(ids)) if ids else None
+        self.state.save(position, last_id)
+        return position, last_id, []
+
+    def _poll(self, position, last_id, deferred):
+        rows, new_position = self.storage.tail_transactions(position)
+        if last_id is not None:
+            rows = [row for row in rows if int(row['transaction_id']) > int(last_id)]
+        retry = self._should_retry(deferred)
+        if not rows and not retry:
+            if new_position != position:
+                self.state.save(new_position, last_id, deferred)
+            return new_position, last_id, deferred, 0
+
+        detected = time.time()
+        # Rows deferred on an earlier poll go first once the model is taking requests again
+        pending = (deferred if retry else []) + rows
+        if self._already_posted is not None:
+            pending = [row for row in pending if str(row['transaction_id']) not in self._already_posted]
+            self._already_posted = None
+        self.state.save(position, last_id, deferred, in_flight=True)
+        posted, still_deferred = self.process_task.process_rows(pending) if pending else ([], [])
+        if rows:
+            last_id = rows[-1]['transaction_id']
+        deferred = ([] if retry else deferred) + still_deferred
+        self.state.save(new_position, last_id, deferred)
+
+        if posted or still_deferred:
+            # Measured from the raw file's last write, so it covers the whole append-to-summary path
+            METRICS.observe("bookkeeper_watch_latency_seconds", time.time() - self._raw_mtime(detected),
+                            "Time from a raw append to its posting in watch mode")
+            message = f"[{datetime.now():%H:%M:%S}] Posted {len(posted)} transaction(s) in {time.time() - detected:.2f}s"
+            if still_deferred:
+                message += f"; {len(still_deferred)} deferred until the model is available"
+            print(message + ".")
+        return new_position, last_id, deferred, len(posted)
+
+    def _should_retry(self, deferred):
+        if not deferred:
+            return False
+        available_in = getattr(self.process_task.model, "available_in", None)
+        return not available_in or available_in() == 0
+
+    def _raw_mtime(self, default):
+        raw_csv = getattr(self.storage, "raw_csv", None)
+        if raw_csv and os.path.isfile(raw_csv):
+            return min(default, os.path.getmtime(raw_csv))
+        return default
+
+    def _ingest_drop_dir(self, drop_dir):
+        # Each CSV dropped here (date, description, amount) is added to the ledger, then moved to ingested/
+        if not os.path.isdir(drop_dir):
+            return
+        done_dir = os.path.join(drop_dir, "ingested")
+        for name in sorted(os.listdir(drop_dir)):
+            path = os.path.join(drop_dir, name)
+            if not name.endswith(".csv") or not os.path.isfile(path):
+                continue
+            with open(path, mode='r', newline='') as file:
+                entries = [(row['date'], row['description'], Money.parse(row['amount'])) for row in csv.DictReader(file)]
+            ids = self.storage.add_transactions(entries)
+            os.makedirs(done_dir, exist_ok=True)
+            os.replace(path, os.path.join(done_dir, name))
+            print(f"[{datetime.now():%H:%M:%S}] Added {len(ids)} transaction(s) from {name}.")
@@ -0,0 +1,21 @@
+import random
+import pytest
+from storage.csv_storage import CsvLedgerStorage
+from tests.factories import random_rows
+
+@pytest.fixture
+def rng():
+    return random.Random(20240601)
+
+@pytest.fixture
+def settled_ledger(tmp_path, rng):
+    # A CSV ledger with a few hundred random rows posted in chunks, about a third of them then
+    # settled and a few of those reopened, so the stored summary has been moved both ways
+    storage = CsvLedgerStorage(str(tmp_path / "raw.csv"), str(tmp_path / "processed.csv"), str(tmp_path / "summary.csv"))
+    rows = random_rows(rng, 400)
+    for start in range(0, len(rows), 64):
+        storage.append_processed(rows[start:start + 64])
+    paid = rng.sample([row["transaction_id"] for row in rows], len(rows) // 3)
+    storage.set_payment_status(paid, "Paid")
+    storage.set_payment_status(paid[:20], "Unpaid")
+    return storage
@@ -0,0 +1,28 @@
+from datetime import date, timedelta
+from utils.money import Money
+
+TYPES = ("Accounts Payable", "Accounts Receivable", "Revenue", "Expense")
+DESCRIPTIONS = ("Stripe payout", "Invoice 1042", "AWS hosting", "Contractor fee", "Office rent", "Domain renewal")
+
+def random_amount(rng):
+    # Cents chosen to hit the values floats get wrong: .01/.10/.29-style fractions and large totals
+    cents = rng.choice((1, 10, 29, 33, 99, 100, 12345, 999999, 10 ** 9 + 7)) * rng.randint(1, 97)
+    return Money.from_cents(-cents if rng.random() < 0.5 else cents)
+
+def random_rows(rng, count, start=date(2024, 1, 1)):
+    rows = []
+    for transaction_id in range(1, count + 1):
+        day = start + timedelta(days=rng.randint(0, 540))
+        due = day + timedelta(days=rng.choice((0, 0, 30)))
+        rows.append({
+            "transaction_id": str(transaction_id),
+            "date": day.isoformat(),
+            "description": rng.choice(DESCRIPTIONS),
+            "amount": random_amount(rng),
+            "category": rng.choice(("Revenue", "Operating Expenses", "Professional Services")),
+            "type": rng.choice(TYPES),
+            "month": day.strftime("%Y-%m"),
+            "due_date": due.isoformat(),
+            "payment_status": "Unpaid",
+        })
+    return rows
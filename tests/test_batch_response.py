@@ -0,0 +1,32 @@
+import pytest
+from utils.batch_response import parse_batch_response
+
+@pytest.mark.parametrize("response", [
+    '{"1": "Revenue", "2": "Bank Fees"}',
+    'Here you go: {"1": " Revenue ", "2": "Bank Fees"} Hope that helps.',
+    '```json\n{"1": "Revenue", "2": "Bank Fees"}\n```',
+    '[{"id": 1, "category": "Revenue"}, {"id": "2", "category": "Bank Fees"}]',
+    "1: Revenue\n2: Bank Fees",
+    "[1]: Revenue\n(2) - Bank Fees",
+    "1 | Revenue\n2 = Bank Fees",
+])
+def test_answer_formats(response):
+    assert parse_batch_response(response, [1, 2]) == {"1": "Revenue", "2": "Bank Fees"}
+
+def test_unexpected_and_empty_answers_are_dropped():
+    response = '{"1": "Revenue", "2": "", "3": 7, "9": "Taxes"}'
+    assert parse_batch_response(response, range(1, 4)) == {"1": "Revenue"}
+
+def test_partial_answer_leaves_the_rest_missing():
+    assert parse_batch_response('{"2": "Taxes"}', [1, 2, 3]) == {"2": "Taxes"}
+
+def test_first_line_wins_for_a_repeated_id():
+    assert parse_batch_response("1: Revenue\n1: Taxes", [1]) == {"1": "Revenue"}
+
+def test_malformed_json_falls_back_to_lines():
+    response = '{"1": "Revenue", "2": \n1: Revenue\n2: Taxes'
+    assert parse_batch_response(response, [1, 2]) == {"1": "Revenue", "2": "Taxes"}
+
+@pytest.mark.parametrize("response", ["", "I cannot help with that.", "{}", "[]", '{"1": null}'])
+def test_no_usable_answer(response):
+    assert parse_batch_response(response, [1, 2]) == {}
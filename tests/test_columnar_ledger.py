@@ -0,0 +1,50 @@
+from datetime import date
+import pytest
+from utils.aging_engine import AgingEngine, aging_types
+from utils.money import Money
+from storage.summary import net_income
+
+pytest.importorskip("numpy")
+from utils.columnar_ledger import ColumnarAgingEngine, ColumnarLedger  # noqa: E402
+
+TODAY = date(2025, 7, 15)
+
+def bucket_view(results):
+    return {
+        report: [(bucket.label, bucket.count, bucket.total, bucket.top_items()) for bucket in buckets]
+        for report, buckets in results.items()
+    }
+
+def test_monthly_summary_matches_stored_summary(settled_ledger):
+    columnar = ColumnarLedger(settled_ledger.iter_processed()).monthly_summary()
+    assert columnar == settled_ledger.load_summary()
+
+def test_monthly_summary_since_matches_row_filter(settled_ledger):
+    columnar = ColumnarLedger(settled_ledger.iter_processed(since="2025-01")).monthly_summary()
+    rows = {month: totals for month, totals in settled_ledger.load_summary().items() if month >= "2025-01"}
+    assert columnar == rows
+
+def test_net_income_matches_summary(settled_ledger):
+    ledger = ColumnarLedger(settled_ledger.iter_processed())
+    total = sum((net_income(totals) for totals in settled_ledger.load_summary().values()), Money(0))
+    assert ledger.net_income() == total
+
+@pytest.mark.parametrize("boundaries, top_n", [((30, 60, 90), 10), ((7, 14), 3), ((45,), 0)])
+def test_aging_matches_row_engine(settled_ledger, boundaries, top_n):
+    reports = ("AR", "AP")
+    rows = list(settled_ledger.iter_processed(types=aging_types(reports), payment_status="Unpaid"))
+    expected = AgingEngine(boundaries, top_n).age(rows, reports, today=TODAY)
+    actual = ColumnarAgingEngine(boundaries, top_n).age(rows, reports, today=TODAY)
+    assert bucket_view(actual) == bucket_view(expected)
+
+def test_aging_skips_paid_rows_like_row_engine(settled_ledger):
+    # Unfiltered rows include settled ones; both engines must drop them the same way
+    rows = list(settled_ledger.iter_processed())
+    expected = AgingEngine().age(rows, today=TODAY)
+    actual = ColumnarAgingEngine().age(rows, today=TODAY)
+    assert bucket_view(actual) == bucket_view(expected)
+
+def test_empty_ledger():
+    assert ColumnarLedger([]).monthly_summary() == {}
+    expected = AgingEngine().age([], today=TODAY)
+    assert bucket_view(ColumnarAgingEngine().age([], today=TODAY)) == bucket_view(expected)
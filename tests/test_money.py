@@ -0,0 +1,63 @@
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+import pytest
+from storage.summary import TOTAL_FIELDS, net_income, summary_column
+from utils.aging_engine import AgingEngine, aging_types
+from utils.money import CENT, Money
+from tests.factories import random_amount
+
+TODAY = date(2025, 7, 15)
+
+def test_str_parse_round_trip(rng):
+    for _ in range(5000):
+        amount = Money.from_cents(rng.randint(-10 ** 12, 10 ** 12))
+        assert Money.parse(str(amount)) == amount
+        assert Decimal(str(amount)) == amount.to_decimal()
+
+def test_parse_matches_decimal_rounding(rng):
+    for _ in range(5000):
+        text = f"{rng.choice(('', '-'))}{rng.randint(0, 10 ** 9)}.{rng.randint(0, 99999):0{rng.randint(1, 5)}d}"
+        expected = Decimal(text).quantize(CENT, rounding=ROUND_HALF_UP)
+        assert Money.parse(text).to_decimal() == expected
+        assert str(Money.parse(text)) == str(expected if expected else Decimal("0.00"))
+
+@pytest.mark.parametrize("value, cents", [
+    ("0.1", 10), ("-0.005", -1), ("1e3", 100000), (" 12.30 ", 1230), (0.29, 29), (12, 1200), (Money(7), 7),
+])
+def test_parse_inputs(value, cents):
+    assert Money.parse(value).cents == cents
+
+@pytest.mark.parametrize("value", ["", "abc", "NaN", "Infinity"])
+def test_parse_rejects_non_amounts(value):
+    with pytest.raises(ValueError):
+        Money.parse(value)
+
+def test_sums_are_exact(rng):
+    for _ in range(50):
+        texts = [str(random_amount(rng)) for _ in range(rng.randint(1, 2000))]
+        total = sum((Money.parse(text) for text in texts), Money(0))
+        assert isinstance(total, Money)
+        assert total.to_decimal() == sum(Decimal(text) for text in texts)
+        assert str(total) == str(sum(Decimal(text) for text in texts).quantize(CENT))
+
+def test_summary_totals_after_settlement(settled_ledger):
+    # The incrementally maintained summary equals a from-scratch Decimal recomputation
+    expected = {}
+    for row in settled_ledger.iter_processed():
+        totals = expected.setdefault(row['month'], {field: Decimal(0) for field in TOTAL_FIELDS})
+        totals[summary_column(row['type'], row['payment_status'])] += Decimal(str(row['amount']))
+
+    summary = settled_ledger.load_summary()
+    assert {month: {field: totals[field].to_decimal() for field in TOTAL_FIELDS} for month, totals in summary.items()} == expected
+    # Settlement only moves amounts between columns, so net income is the sum of every posted amount
+    posted = sum(Decimal(str(row['amount'])) for row in settled_ledger.iter_processed())
+    assert sum(net_income(totals).to_decimal() for totals in summary.values()) == posted
+
+def test_aging_totals_after_settlement(settled_ledger):
+    reports = ("AR", "AP")
+    rows = list(settled_ledger.iter_processed(types=aging_types(reports), payment_status="Unpaid"))
+    results = AgingEngine().age(rows, reports, today=TODAY)
+    for report, types in (("AR", aging_types(("AR",))), ("AP", aging_types(("AP",)))):
+        open_items = [row for row in rows if row['type'] in types]
+        assert sum(bucket.count for bucket in results[report]) == len(open_items)
+        assert sum(bucket.total.to_decimal() for bucket in results[report]) == sum(Decimal(str(row['amount'])) for row in open_items)
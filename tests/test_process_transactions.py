@@ -0,0 +1,35 @@
+import random
+import pytest
+from benchmarks.fake_llm import FakeLLM
+from storage.csv_storage import CsvLedgerStorage
+from tasks.process_transactions_task import ProcessTransactionsTask
+from utils.rule_engine import DEFAULT_RULES, RuleEngine
+from tests.factories import DESCRIPTIONS, random_amount
+
+VENDORS = DESCRIPTIONS + ("Team lunch", "Conference travel", "Ad campaign", "Bank charge", "Payroll run")
+
+def process(tmp_path, rng, concurrency, batch_size):
+    directory = tmp_path / f"c{concurrency}-b{batch_size}"
+    directory.mkdir()
+    storage = CsvLedgerStorage(str(directory / "raw.csv"), str(directory / "processed.csv"), str(directory / "summary.csv"))
+    storage.add_transactions([
+        (f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", f"{rng.choice(VENDORS)} {rng.randint(1, 40)}", random_amount(rng))
+        for _ in range(300)
+    ])
+    model = FakeLLM()
+    task = ProcessTransactionsTask(model, storage=storage, rules=RuleEngine(DEFAULT_RULES), concurrency=concurrency,
+                                   batch_size=batch_size, chunk_size=64)
+    task.execute()
+    return list(storage.iter_processed()), storage.load_summary(), model.calls
+
+@pytest.mark.parametrize("concurrency, batch_size", [(4, 1), (1, 8), (4, 8)])
+def test_concurrency_and_batching_post_the_same_rows(tmp_path, concurrency, batch_size):
+    # Each run draws the same ledger from its own seeded generator
+    sequential_rows, sequential_summary, sequential_calls = process(tmp_path, random.Random(7), 1, 1)
+    rows, summary, calls = process(tmp_path, random.Random(7), concurrency, batch_size)
+
+    assert len(sequential_rows) == 300
+    assert rows == sequential_rows
+    assert summary == sequential_summary
+    if batch_size > 1:
+        assert calls < sequential_calls
@@ -0,0 +1,81 @@
+import pytest
+from storage.summary import net_income
+from tasks.mark_transaction_paid_task import MarkTransactionPaidTask
+from utils.money import Money
+from utils.settlement import (
+    ALREADY_PAID, DUPLICATE, INVALID, NO_MATCH, NOT_FOUND, SETTLED, SettlementIndex,
+)
+
+def ledger_row(transaction_id, amount, due_date, payment_status="Unpaid"):
+    return {
+        "transaction_id": transaction_id, "date": due_date, "description": f"Invoice {transaction_id}",
+        "amount": Money.parse(amount), "due_date": due_date, "payment_status": payment_status,
+    }
+
+def by_amount(amount, paid_on):
+    return {"transaction_id": "", "amount": amount, "date": paid_on}
+
+def outcomes(results):
+    return [(status, row and str(row["transaction_id"])) for _, status, row in results]
+
+@pytest.fixture
+def index():
+    return SettlementIndex([
+        ledger_row("1", "100.00", "2025-03-01"),
+        ledger_row("2", "100.00", "2025-03-20"),
+        ledger_row("3", "100.00", "2025-06-01"),
+        ledger_row("4", "-42.50", "2025-03-10"),
+        ledger_row("5", "250.00", "2025-03-05", payment_status="Paid"),
+    ])
+
+def test_match_by_id(index):
+    results = index.match([{"transaction_id": "1"}, {"transaction_id": "1"}, {"transaction_id": "5"}, {"transaction_id": "99"}])
+    assert outcomes(results) == [(SETTLED, "1"), (DUPLICATE, "1"), (ALREADY_PAID, "5"), (NOT_FOUND, None)]
+    assert index.settled_ids(results) == ["1"]
+
+def test_integer_ids_match_text_ids():
+    # SQLite hands back integer IDs; remittance files always carry text
+    index = SettlementIndex([ledger_row(7, "10.00", "2025-01-01")])
+    assert outcomes(index.match([{"transaction_id": "7"}])) == [(SETTLED, "7")]
+
+def test_closest_due_date_wins(index):
+    assert outcomes(index.match([by_amount("100", "2025-03-18")])) == [(SETTLED, "2")]
+
+def test_tie_settles_the_earlier_due_date():
+    index = SettlementIndex([ledger_row("1", "100.00", "2025-03-01"), ledger_row("2", "100.00", "2025-03-21")])
+    assert outcomes(index.match([by_amount("100.00", "2025-03-11")])) == [(SETTLED, "1")]
+
+def test_each_transaction_settles_once(index):
+    items = [by_amount("100.00", "2025-03-02")] * 3
+    assert outcomes(index.match(items)) == [(SETTLED, "1"), (SETTLED, "2"), (NO_MATCH, None)]
+
+def test_id_and_amount_matches_share_claims(index):
+    results = index.match([{"transaction_id": "1"}, by_amount("100.00", "2025-03-01")])
+    assert outcomes(results) == [(SETTLED, "1"), (SETTLED, "2")]
+
+def test_date_window_and_amount_must_match(index):
+    items = [by_amount("100.00", "2025-04-25"), by_amount("99.99", "2025-03-01"), by_amount("-42.5", "2025-04-09")]
+    assert outcomes(index.match(items)) == [(NO_MATCH, None), (NO_MATCH, None), (SETTLED, "4")]
+    assert outcomes(SettlementIndex([ledger_row("1", "1.00", "2025-01-01")], date_window=0).match(
+        [by_amount("1.00", "2025-01-02")])) == [(NO_MATCH, None)]
+
+def test_paid_rows_never_match_by_amount(index):
+    assert outcomes(index.match([by_amount("250.00", "2025-03-05")])) == [(NO_MATCH, None)]
+
+@pytest.mark.parametrize("amount, paid_on", [("abc", "2025-03-01"), ("100.00", "03/01/2025"), ("", "")])
+def test_invalid_items(index, amount, paid_on):
+    assert outcomes(index.match([by_amount(amount, paid_on)])) == [(INVALID, None)]
+
+def test_remittance_settles_the_ledger(settled_ledger, tmp_path):
+    unpaid = list(settled_ledger.iter_processed(payment_status="Unpaid"))
+    remittance = tmp_path / "remittance.csv"
+    lines = [f"{row['transaction_id']},," for row in unpaid[:2]] + [f",{row['amount']},{row['due_date']}" for row in unpaid[2:5]]
+    remittance.write_text("transaction_id,amount,date\n" + "\n".join(lines) + "\n")
+    net_before = {month: net_income(totals) for month, totals in settled_ledger.load_summary().items()}
+
+    message = MarkTransactionPaidTask(storage=settled_ledger).execute(remittance_file=str(remittance))
+
+    assert message.startswith("Settled 5 of 5 item(s)")
+    assert len(list(settled_ledger.iter_processed(payment_status="Unpaid"))) == len(unpaid) - 5
+    # Settlement moves amounts between columns, never in or out of a month
+    assert {month: net_income(totals) for month, totals in settled_ledger.load_summary().items()} == net_before
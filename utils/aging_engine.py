@@ -0,0 +1,86 @@
+import heapq
+from bisect import bisect_left
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import count
+from utils.money import Money
+
+DEFAULT_BOUNDARIES = (30, 60, 90)
+AGING_TYPES = {
+    "AR": ("Accounts Receivable", "Revenue"),
+    "AP": ("Accounts Payable", "Expense"),
+}
+
+@lru_cache(maxsize=8192)
+def parse_date_ordinal(value):
+    # Ledgers repeat a small set of due dates, so each distinct string is parsed once
+    return datetime.strptime(value, "%Y-%m-%d").toordinal()
+
+def bucket_labels(boundaries):
+    labels = []
+    lower = 0
+    for upper in boundaries:
+        labels.append(f"{lower}-{upper} days")
+        lower = upper + 1
+    labels.append(f"{boundaries[-1]}+ days")
+    return labels
+
+class AgingBucket:
+    __slots__ = ("label", "count", "total", "_top", "_top_n")
+
+    def __init__(self, label, top_n):
+        self.label = label
+        self.count = 0
+        self.total = Money(0)
+        self._top = []
+        self._top_n = top_n
+
+    def add(self, amount, item, sequence):
+        self.count += 1
+        self.total += amount
+        if self._top_n <= 0:
+            return
+        # Min-heap on size keeps only the N largest open items in memory
+        entry = (abs(amount), -sequence, item)
+        if len(self._top) < self._top_n:
+            heapq.heappush(self._top, entry)
+        elif entry > self._top[0]:
+            heapq.heapreplace(self._top, entry)
+
+    def top_items(self):
+        return [item for _, _, item in sorted(self._top, reverse=True)]
+
+class AgingEngine:
+    def __init__(self, boundaries=DEFAULT_BOUNDARIES, top_n=10):
+        self.boundaries = tuple(sorted(boundaries))
+        if not self.boundaries:
+            raise ValueError("Aging needs at least one bucket boundary")
+        self.labels = bucket_labels(self.boundaries)
+        self.top_n = top_n
+
+    def age(self, rows, reports=("AR", "AP"), today=None):
+        today_ordinal = (today or date.today()).toordinal()
+        report_for_type = {type_: report for report in reports for type_ in AGING_TYPES[report]}
+        results = {report: [AgingBucket(label, self.top_n) for label in self.labels] for report in reports}
+        sequence = count()
+
+        for row in rows:
+            report = report_for_type.get(row['type'])
+            if report is None or row.get('payment_status', 'Unpaid') == "Paid":
+                continue
+            due_date = row.get('due_date') or row.get('date')
+            if not due_date:
+                continue
+
+            delta_days = today_ordinal - parse_date_ordinal(due_date)
+            bucket = results[report][bisect_left(self.boundaries, delta_days)]
+            amount = Money.parse(row['amount'])
+            bucket.add(amount, (row['description'], due_date, amount), next(sequence))
+
+        return results
+
+def aging_types(reports):
+    return tuple(type_ for report in reports for type_ in AGING_TYPES[report])
+
+def parse_boundaries(value):
+    return tuple(int(part) for part in value.split(",") if part.strip())
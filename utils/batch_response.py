@@ -0,0 +1,40 @@
+import json
+import re
+
+LINE_PATTERN = re.compile(r'^\s*[\[(#]?\s*(\w+)\s*[\])]?\s*[:=|.)\-]+\s*(.+?)\s*$')
+
+def parse_batch_response(response, expected_ids):
+    # Returns {id: raw_label} for whichever expected ids the model answered; anything else is ignored
+    expected = {str(item_id) for item_id in expected_ids}
+    labels = _parse_json(response)
+    if not labels:
+        labels = _parse_lines(response)
+    return {item_id: label for item_id, label in labels.items() if item_id in expected and label}
+
+def _parse_json(response):
+    text = re.sub(r'```(?:json)?', '', response)
+    for start, end in (("{", "}"), ("[", "]")):
+        first, last = text.find(start), text.rfind(end)
+        if first == -1 or last <= first:
+            continue
+        try:
+            data = json.loads(text[first:last + 1])
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            return {str(key).strip(): str(value).strip() for key, value in data.items() if isinstance(value, str)}
+        if isinstance(data, list):
+            labels = {}
+            for entry in data:
+                if isinstance(entry, dict) and "id" in entry and isinstance(entry.get("category"), str):
+                    labels[str(entry["id"]).strip()] = entry["category"].strip()
+            return labels
+    return {}
+
+def _parse_lines(response):
+    labels = {}
+    for line in response.splitlines():
+        match = LINE_PATTERN.match(line)
+        if match:
+            labels.setdefault(match.group(1), match.group(2))
+    return labels
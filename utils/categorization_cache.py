@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import re
+from collections import OrderedDict
+from storage.checkpoint import write_json_durably
+
+def normalize_description(description):
+    # Invoice numbers, dates and punctuation vary month to month; the vendor wording doesn't
+    text = re.sub(r'\d+', '0', description.lower())
+    text = re.sub(r'[^a-z0]+', ' ', text)
+    return ' '.join(text.split())
+
+def get_model_name(model):
+    for attr in ("model", "model_name"):
+        value = getattr(model, attr, None)
+        if isinstance(value, str):
+            return value
+    return type(model).__name__
+
+class CategorizationCache:
+    def __init__(self, path="example/category_cache.json", max_entries=10000):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        # This process's lookups; the lifetime totals carry over between runs in the cache file
+        self.hits = 0
+        self.misses = 0
+        self.lifetime_hits = 0
+        self.lifetime_misses = 0
+        self._dirty = False
+        self._load()
+
+    def make_key(self, description, amount, template_version, model_name):
+        sign = "-" if float(amount) < 0 else "+"
+        return f"{model_name}|{template_version}|{sign}|{normalize_description(description)}"
+
+    def get(self, key):
+        category = self.entries.get(key)
+        self._dirty = True
+        if category is None:
+            self.misses += 1
+            self.lifetime_misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        self.lifetime_hits += 1
+        return category
+
+    def put(self, key, category):
+        self.entries[key] = category
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self._dirty = True
+
+    def invalidate(self, model_name=None, template_version=None):
+        removed = 0
+        for key in list(self.entries):
+            key_model, key_version, _, _ = key.split("|", 3)
+            if model_name is not None and key_model != model_name:
+                continue
+            if template_version is not None and key_version != template_version:
+                continue
+            del self.entries[key]
+            removed += 1
+        if removed:
+            self._dirty = True
+        return removed
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": hit_rate(self.hits, self.misses),
+            "lifetime_hits": self.lifetime_hits,
+            "lifetime_misses": self.lifetime_misses,
+            "lifetime_hit_rate": hit_rate(self.lifetime_hits, self.lifetime_misses),
+        }
+
+    def reset_stats(self):
+        self.hits = self.misses = self.lifetime_hits = self.lifetime_misses = 0
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        write_json_durably(self.path, {
+            "entries": list(self.entries.items()),
+            "hits": self.lifetime_hits,
+            "misses": self.lifetime_misses,
+        })
+        self._dirty = False
+
+    def _load(self):
+        if not os.path.isfile(self.path):
+            return
+        with open(self.path, mode='r') as file:
+            data = json.load(file)
+        for key, category in data.get("entries", [])[-self.max_entries:]:
+            self.entries[key] = category
+        self.lifetime_hits = data.get("hits", 0)
+        self.lifetime_misses = data.get("misses", 0)
+
+def hit_rate(hits, misses):
+    lookups = hits + misses
+    return hits / lookups if lookups else 0.0
+
+def load_cache(config):
+    if config["CATEGORY_CACHE_SIZE"] <= 0:
+        return None
+    return CategorizationCache(config["CATEGORY_CACHE_PATH"], config["CATEGORY_CACHE_SIZE"])
+
+def main():
+    from utils.env_loader import load_env
+
+    parser = argparse.ArgumentParser(description="Inspect or invalidate the categorization cache.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="Show cache size and hit rate")
+    clear = subparsers.add_parser("clear", help="Drop cached categories")
+    clear.add_argument("--model", help="Only drop entries produced by this model")
+    clear.add_argument("--template-version", help="Only drop entries for this prompt template version")
+    clear.add_argument("--reset-stats", action="store_true", help="Also reset the hit and miss counters")
+    args = parser.parse_args()
+
+    config = load_env()
+    cache = CategorizationCache(config["CATEGORY_CACHE_PATH"], max(1, config["CATEGORY_CACHE_SIZE"]))
+    if args.command == "stats":
+        stats = cache.stats()
+        print(f"{stats['entries']} cached categories in {cache.path} (max {stats['max_entries']})")
+        print(
+            f"Lookups: {stats['lifetime_hits']} hits, {stats['lifetime_misses']} misses "
+            f"({stats['lifetime_hit_rate']:.1%} hit rate)"
+        )
+    else:
+        removed = cache.invalidate(model_name=args.model, template_version=args.template_version)
+        if args.reset_stats:
+            cache.reset_stats()
+        cache.save()
+        print(f"Removed {removed} cached categories.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+from datetime import date
+from storage.summary import TOTAL_FIELDS, summary_column
+from utils.money import Money
+from utils.aging_engine import AGING_TYPES, DEFAULT_BOUNDARIES, bucket_labels, parse_date_ordinal
+
+try:
+    import numpy as np
+except ImportError:  # The columnar engine is optional; the row-loop paths never need numpy
+    np = None
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("The columnar analytics engine requires numpy (pip install numpy)")
+
+class _Dictionary:
+    # Dictionary-encodes a string column into small integer codes
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def encode(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def code(self, value):
+        return self._codes.get(value)
+
+class ColumnarAgingBucket:
+    __slots__ = ("label", "count", "total", "_items")
+
+    def __init__(self, label, count, total, items):
+        self.label = label
+        self.count = count
+        self.total = total
+        self._items = items
+
+    def top_items(self):
+        return self._items
+
+class ColumnarLedger:
+    def __init__(self, rows):
+        _require_numpy()
+        self.months = _Dictionary()
+        self.types = _Dictionary()
+        self.statuses = _Dictionary()
+        self.categories = _Dictionary()
+        self.descriptions = []
+        self.due_dates = []
+        self.amounts = []
+
+        cents, due_ordinals, has_due_date, month_codes, type_codes, status_codes, category_codes = [], [], [], [], [], [], []
+        for row in rows:
+            due_date = row.get('due_date') or row.get('date')
+            amount = Money.parse(row['amount'])
+            cents.append(amount.cents)
+            due_ordinals.append(parse_date_ordinal(due_date) if due_date else 0)
+            has_due_date.append(bool(due_date))
+            month_codes.append(self.months.encode(row['month']))
+            type_codes.append(self.types.encode(row['type']))
+            status_codes.append(self.statuses.encode(row.get('payment_status') or 'Unpaid'))
+            category_codes.append(self.categories.encode(row.get('category', '')))
+            self.descriptions.append(row['description'])
+            self.due_dates.append(due_date)
+            self.amounts.append(amount)
+
+        self.amount_cents = np.array(cents, dtype=np.int64)
+        self.due_ordinal = np.array(due_ordinals, dtype=np.int64)
+        self.has_due_date = np.array(has_due_date, dtype=bool)
+        self.month = np.array(month_codes, dtype=np.int32)
+        self.type = np.array(type_codes, dtype=np.int32)
+        self.status = np.array(status_codes, dtype=np.int32)
+        self.category = np.array(category_codes, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.amount_cents)
+
+    def monthly_summary(self):
+        # Map every (type, status) pair to its summary column, then group-by (month, column) in one bincount
+        column_lookup = np.array([
+            [TOTAL_FIELDS.index(summary_column(type_, status)) for status in self.statuses.values]
+            for type_ in self.types.values
+        ], dtype=np.int64).reshape(len(self.types.values), len(self.statuses.values))
+        columns = column_lookup[self.type, self.status] if len(self) else np.zeros(0, dtype=np.int64)
+        group = self.month.astype(np.int64) * len(TOTAL_FIELDS) + columns
+        totals = np.zeros(len(self.months.values) * len(TOTAL_FIELDS), dtype=np.int64)
+        np.add.at(totals, group, self.amount_cents)
+        totals = totals.reshape(len(self.months.values), len(TOTAL_FIELDS))
+
+        return {
+            month: {field: Money.from_cents(int(totals[code, index])) for index, field in enumerate(TOTAL_FIELDS)}
+            for code, month in enumerate(self.months.values)
+        }
+
+    def net_income(self):
+        return Money.from_cents(int(self.amount_cents.sum()))
+
+    def aging(self, reports=("AR", "AP"), today=None, boundaries=DEFAULT_BOUNDARIES, top_n=10):
+        today_ordinal = (today or date.today()).toordinal()
+        boundaries = np.array(sorted(boundaries), dtype=np.int64)
+        labels = bucket_labels(tuple(int(boundary) for boundary in boundaries))
+        paid_code = self.statuses.code("Paid")
+        open_items = self.has_due_date & (self.status != (-1 if paid_code is None else paid_code))
+        buckets = np.searchsorted(boundaries, today_ordinal - self.due_ordinal, side='left')
+
+        results = {}
+        for report in reports:
+            type_codes = [self.types.code(type_) for type_ in AGING_TYPES[report] if self.types.code(type_) is not None]
+            selected = open_items & np.isin(self.type, type_codes)
+            counts = np.bincount(buckets[selected], minlength=len(labels))
+            totals = np.zeros(len(labels), dtype=np.int64)
+            np.add.at(totals, buckets[selected], self.amount_cents[selected])
+
+            report_buckets = []
+            for index, label in enumerate(labels):
+                items = []
+                if top_n > 0 and counts[index]:
+                    positions = np.flatnonzero(selected & (buckets == index))
+                    # Largest amounts first; ties keep ledger order
+                    order = np.lexsort((positions, -np.abs(self.amount_cents[positions])))[:top_n]
+                    items = [
+                        (self.descriptions[position], self.due_dates[position], self.amounts[position])
+                        for position in positions[order]
+                    ]
+                report_buckets.append(ColumnarAgingBucket(label, int(counts[index]), Money.from_cents(int(totals[index])), items))
+            results[report] = report_buckets
+        return results
+
+class ColumnarAgingEngine:
+    # Drop-in replacement for AgingEngine that ages the ledger with vectorized group-bys
+    def __init__(self, boundaries=DEFAULT_BOUNDARIES, top_n=10):
+        _require_numpy()
+        self.boundaries = tuple(sorted(boundaries))
+        self.top_n = top_n
+
+    def age(self, rows, reports=("AR", "AP"), today=None):
+        ledger = ColumnarLedger(rows)
+        return ledger.aging(reports, today, self.boundaries, self.top_n)
@@ -0,0 +1,55 @@
+import json
+import os
+
+# Every entity keeps the standard ledger file names inside its own directory
+ENTITY_FILES = {
+    "RAW_CSV": "transactions.csv",
+    "PROCESSED_CSV": "processed_transactions.csv",
+    "SUMMARY_CSV": "monthly_summary.csv",
+    "LEDGER_DB_PATH": "ledger.db",
+    "LEDGER_PARTITION_DIR": "processed",
+    "INGEST_CHECKPOINT_PATH": "ingest_checkpoint.json",
+    "CATEGORY_CACHE_PATH": "category_cache.json",
+    "SIMILARITY_INDEX_PATH": "similarity_index.json",
+}
+
+def load_entities(source):
+    # source is a directory with one sub-directory per entity, or a JSON manifest listing
+    # entities as paths or {"name": ..., "path": ...}; relative paths resolve against the manifest
+    if os.path.isdir(source):
+        entities = [
+            {"name": name, "path": os.path.join(source, name)}
+            for name in sorted(os.listdir(source))
+            if os.path.isfile(os.path.join(source, name, ENTITY_FILES["RAW_CSV"]))
+        ]
+    elif os.path.isfile(source):
+        with open(source, mode='r') as file:
+            data = json.load(file)
+        base = os.path.dirname(source)
+        entities = []
+        for entry in data.get("entities", []) if isinstance(data, dict) else data:
+            if isinstance(entry, str):
+                entry = {"path": entry}
+            if not isinstance(entry, dict) or not entry.get("path"):
+                raise ValueError(f"Invalid entity entry in {source}: {entry!r}")
+            path = os.path.join(base, entry["path"])
+            entities.append({"name": entry.get("name") or os.path.basename(os.path.normpath(path)), "path": path})
+    else:
+        raise ValueError(f"Entity source not found: {source}")
+
+    names = [entity["name"] for entity in entities]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate entity name(s): {', '.join(duplicates)}")
+    if not entities:
+        raise ValueError(f"No entity ledgers found in {source}")
+    return entities
+
+def entity_config(config, entity):
+    # The shared config with every per-ledger path pointed into the entity's directory
+    scoped = dict(config)
+    for key, file_name in ENTITY_FILES.items():
+        if key == "SIMILARITY_INDEX_PATH" and not config[key]:
+            continue
+        scoped[key] = os.path.join(entity["path"], file_name)
+    return scoped
@@ -6,5 +6,45 @@ def load_env():
     return {
         "MODEL_PROVIDER": os.getenv("MODEL_PROVIDER", "ollama"),
         "OLLAMA_MODEL": os.getenv("OLLAMA_MODEL", "llama3"),
+        "OLLAMA_BASE_URL": os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
         "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", ""),
+        "OPENAI_MODEL": os.getenv("OPENAI_MODEL", "gpt-3.5-turbo-instruct"),
+        "CATEGORIZATION_CONCURRENCY": int(os.getenv("CATEGORIZATION_CONCURRENCY", "1")),
+        "CATEGORIZATION_BATCH_SIZE": int(os.getenv("CATEGORIZATION_BATCH_SIZE", "1")),
+        "CATEGORY_CACHE_PATH": os.getenv("CATEGORY_CACHE_PATH", "example/category_cache.json"),
+        "CATEGORY_CACHE_SIZE": int(os.getenv("CATEGORY_CACHE_SIZE", "10000")),
+        "CATEGORY_LABELS": os.getenv("CATEGORY_LABELS", ""),
+        "CATEGORY_RULES_PATH": os.getenv("CATEGORY_RULES_PATH", "example/category_rules.json"),
+        "LEDGER_BACKEND": os.getenv("LEDGER_BACKEND", "csv"),
+        "LEDGER_DB_PATH": os.getenv("LEDGER_DB_PATH", "example/ledger.db"),
+        "RAW_CSV": os.getenv("RAW_CSV", "example/transactions.csv"),
+        "PROCESSED_CSV": os.getenv("PROCESSED_CSV", "example/processed_transactions.csv"),
+        "SUMMARY_CSV": os.getenv("SUMMARY_CSV", "example/monthly_summary.csv"),
+        "LEDGER_PARTITION_DIR": os.getenv("LEDGER_PARTITION_DIR", "example/processed"),
+        "INGEST_CHUNK_SIZE": int(os.getenv("INGEST_CHUNK_SIZE", "500")),
+        "INGEST_CHECKPOINT_PATH": os.getenv("INGEST_CHECKPOINT_PATH", "example/ingest_checkpoint.json"),
+        "AGING_BUCKETS": os.getenv("AGING_BUCKETS", "30,60,90"),
+        "AGING_TOP_N": int(os.getenv("AGING_TOP_N", "10")),
+        "ANALYTICS_ENGINE": os.getenv("ANALYTICS_ENGINE", "rows"),
+        "SETTLEMENT_DATE_WINDOW": int(os.getenv("SETTLEMENT_DATE_WINDOW", "30")),
+        "SIMILARITY_INDEX_PATH": os.getenv("SIMILARITY_INDEX_PATH", "example/similarity_index.json"),
+        "SIMILARITY_THRESHOLD": float(os.getenv("SIMILARITY_THRESHOLD", "0.8")),
+        "LLM_TIMEOUT": float(os.getenv("LLM_TIMEOUT", "60")),
+        "LLM_MAX_RETRIES": int(os.getenv("LLM_MAX_RETRIES", "3")),
+        "LLM_BACKOFF_BASE": float(os.getenv("LLM_BACKOFF_BASE", "0.5")),
+        "LLM_BACKOFF_MAX": float(os.getenv("LLM_BACKOFF_MAX", "30")),
+        "LLM_REQUESTS_PER_MINUTE": float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0")),
+        "LLM_RATE_BURST": int(os.getenv("LLM_RATE_BURST", "1")),
+        "LLM_BREAKER_THRESHOLD": int(os.getenv("LLM_BREAKER_THRESHOLD", "5")),
+        "LLM_BREAKER_RESET": float(os.getenv("LLM_BREAKER_RESET", "30")),
+        "LLM_POOL_SIZE": int(os.getenv("LLM_POOL_SIZE", "10")),
+        "ENTITIES_PATH": os.getenv("ENTITIES_PATH", "example/entities"),
+        "ENTITY_WORKERS": int(os.getenv("ENTITY_WORKERS", "4")),
+        "CONSOLIDATED_SUMMARY_CSV": os.getenv("CONSOLIDATED_SUMMARY_CSV", "example/consolidated_summary.csv"),
+        "WATCH_STATE_PATH": os.getenv("WATCH_STATE_PATH", "example/watch_state.json"),
+        "WATCH_INTERVAL": float(os.getenv("WATCH_INTERVAL", "0.2")),
+        "WATCH_DROP_DIR": os.getenv("WATCH_DROP_DIR", ""),
+        "RETRY_QUEUE_ROUNDS": int(os.getenv("RETRY_QUEUE_ROUNDS", "2")),
+        "METRICS_PATH": os.getenv("METRICS_PATH", ""),
+        "METRICS_FORMAT": os.getenv("METRICS_FORMAT", "prometheus"),
     }
@@ -0,0 +1,171 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Seconds; wide enough for a cached lookup at one end and a slow local model at the other
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+EXPORT_FORMATS = ("prometheus", "jsonl")
+
+def estimate_tokens(text):
+    # Plain LLM endpoints return bare strings with no usage block; ~4 characters per token is the usual estimate
+    return (len(text) + 3) // 4 if text else 0
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(label_key, extra=()):
+    pairs = list(label_key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum", "max")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, fraction):
+        # Upper bound of the bucket holding the requested rank; good enough for p50/p99 at a glance
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return self.max
+
+class Metrics:
+    # Counters and latency histograms keyed by (name, labels); safe to share across worker threads
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, help_text="", **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+            self._help.setdefault(name, help_text)
+
+    def observe(self, name, value, help_text="", **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+            self._help.setdefault(name, help_text)
+
+    @contextmanager
+    def span(self, name, **labels):
+        # Times a block of work into bookkeeper_span_seconds, labelled with the span name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("bookkeeper_span_seconds", time.perf_counter() - start, "Time spent per task phase", span=name, **labels)
+
+    def counter(self, name, **labels):
+        return self._counters.get((name, _label_key(labels)), 0)
+
+    def histogram(self, name, **labels):
+        return self._histograms.get((name, _label_key(labels)))
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def hit_rates(self):
+        # Share of categorizations each path (rules, cache, similarity, model) answered, per task
+        totals = {}
+        for (name, label_key), value in list(self._counters.items()):
+            if name != "bookkeeper_categorizations_total":
+                continue
+            labels = dict(label_key)
+            totals.setdefault(labels.get("task", ""), {})[labels["path"]] = value
+        rates = {}
+        for task, paths in totals.items():
+            total = sum(paths.values())
+            rates[task] = {path: paths.get(path, 0) / total for path in ("rules", "cache", "similarity", "model", "deferred")} if total else {}
+        return rates
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+            help_texts = dict(self._help)
+        declared = set()
+        for (name, label_key), value in counters:
+            if name not in declared:
+                declared.add(name)
+                lines.append(f"# HELP {name} {help_texts.get(name) or name}")
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{_format_labels(label_key)} {value}")
+        for (name, label_key), histogram in histograms:
+            if name not in declared:
+                declared.add(name)
+                lines.append(f"# HELP {name} {help_texts.get(name) or name}")
+                lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                cumulative += bucket_count
+                upper = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{name}_bucket{_format_labels(label_key, [('le', upper)])} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(label_key)} {histogram.sum}")
+            lines.append(f"{name}_count{_format_labels(label_key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def to_record(self, **fields):
+        # One JSON-serializable snapshot, e.g. for a JSON-lines log after each task run
+        with self._lock:
+            counters = [{"name": name, "labels": dict(label_key), "value": value} for (name, label_key), value in sorted(self._counters.items())]
+            histograms = [
+                {
+                    "name": name, "labels": dict(label_key), "count": histogram.count, "sum": histogram.sum,
+                    "p50": histogram.quantile(0.5), "p99": histogram.quantile(0.99),
+                }
+                for (name, label_key), histogram in sorted(self._histograms.items(), key=lambda item: item[0])
+            ]
+        record = {"timestamp": time.time()}
+        record.update(fields)
+        record.update({"counters": counters, "histograms": histograms, "hit_rates": self.hit_rates()})
+        return record
+
+    def export(self, path, export_format="prometheus", **fields):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported metrics format: {export_format}")
+        if export_format == "jsonl":
+            with open(path, "a") as file:
+                file.write(json.dumps(self.to_record(**fields), default=str) + "\n")
+            return
+        # Prometheus textfile collectors expect the file to be swapped in whole
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as file:
+            file.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+# Process-wide registry shared by the agent, tasks and storage backends
+METRICS = Metrics()
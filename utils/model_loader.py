@@ -1,10 +1,79 @@
-from langchain_community.llms import Ollama
-from langchain_openai import OpenAI
+import threading
+from utils.resilient_model import CircuitBreaker, ResilientModel, TokenBucket
 
-def load_model(config):
+SUPPORTED_PROVIDERS = ("ollama", "openai")
+
+def build_client(config):
+    # Provider packages are imported here rather than at module level; langchain dominates startup time
     if config["MODEL_PROVIDER"] == "ollama":
-        return Ollama(model=config["OLLAMA_MODEL"])
+        from utils.ollama_client import OllamaClient
+        # Same shared keep-alive pool as the OpenAI client below, sized by LLM_POOL_SIZE
+        return OllamaClient(config["OLLAMA_MODEL"], config["OLLAMA_BASE_URL"], timeout=config["LLM_TIMEOUT"],
+                            pool_size=config["LLM_POOL_SIZE"])
     elif config["MODEL_PROVIDER"] == "openai":
-        return OpenAI(openai_api_key=config["OPENAI_API_KEY"])
+        import httpx
+        from langchain_openai import OpenAI
+        # One pooled, keep-alive HTTP client shared by every worker thread; retries are ours, not the SDK's
+        pool_size = config["LLM_POOL_SIZE"]
+        http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=config["LLM_TIMEOUT"],
+        )
+        return OpenAI(model_name=config["OPENAI_MODEL"], openai_api_key=config["OPENAI_API_KEY"], http_client=http_client,
+                      timeout=config["LLM_TIMEOUT"], max_retries=0)
     else:
         raise ValueError("Unsupported MODEL_PROVIDER")
+
+def model_name(config):
+    if config["MODEL_PROVIDER"] == "ollama":
+        return config["OLLAMA_MODEL"]
+    return config["OPENAI_MODEL"]
+
+def load_model(config, rate_limiter=None):
+    # rate_limiter lets several models (or processes) share one request budget
+    return ResilientModel(
+        build_client(config),
+        max_retries=config["LLM_MAX_RETRIES"],
+        backoff_base=config["LLM_BACKOFF_BASE"],
+        backoff_max=config["LLM_BACKOFF_MAX"],
+        rate_limiter=rate_limiter or TokenBucket(config["LLM_REQUESTS_PER_MINUTE"], config["LLM_RATE_BURST"]),
+        breaker=CircuitBreaker(config["LLM_BREAKER_THRESHOLD"], config["LLM_BREAKER_RESET"]),
+        token_limit_key="num_predict" if config["MODEL_PROVIDER"] == "ollama" else "max_tokens",
+    )
+
+class LazyModel:
+    # Stands in for the model client and builds it on first use, so report-only commands never import langchain
+    def __init__(self, config, loader=load_model):
+        if config["MODEL_PROVIDER"] not in SUPPORTED_PROVIDERS:
+            raise ValueError("Unsupported MODEL_PROVIDER")
+        self._config = config
+        self._loader = loader
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    @property
+    def model(self):
+        # Cache keys use the model name, which comes from config so a fully cached run never builds the client
+        return model_name(self._config)
+
+    def get(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._loader(self._config)
+        return self._model
+
+    def invoke(self, *args, **kwargs):
+        return self.get().invoke(*args, **kwargs)
+
+    def batch(self, *args, **kwargs):
+        return self.get().batch(*args, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
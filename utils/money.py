@@ -0,0 +1,71 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+CENT = Decimal("0.01")
+
+class Money(int):
+    # An amount held as integer cents; sums are exact and it formats back to "1234.56"
+    __slots__ = ()
+
+    @classmethod
+    def parse(cls, value):
+        if isinstance(value, Money):
+            return value
+        if isinstance(value, float):
+            value = repr(value)
+        try:
+            dollars = Decimal(str(value).strip())
+        except InvalidOperation:
+            raise ValueError(f"Invalid amount: {value!r}") from None
+        if not dollars.is_finite():
+            raise ValueError(f"Invalid amount: {value!r}")
+        return cls(int(dollars.quantize(CENT, rounding=ROUND_HALF_UP).scaleb(2)))
+
+    @classmethod
+    def from_cents(cls, cents):
+        return cls(cents)
+
+    @property
+    def cents(self):
+        return int(self)
+
+    def to_decimal(self):
+        return Decimal(int(self)).scaleb(-2)
+
+    def __add__(self, other):
+        if not isinstance(other, int):
+            return NotImplemented
+        return Money(int(self) + int(other))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if not isinstance(other, int):
+            return NotImplemented
+        return Money(int(self) - int(other))
+
+    def __rsub__(self, other):
+        if not isinstance(other, int):
+            return NotImplemented
+        return Money(int(other) - int(self))
+
+    def __neg__(self):
+        return Money(-int(self))
+
+    def __abs__(self):
+        return Money(abs(int(self)))
+
+    def __float__(self):
+        return int(self) / 100
+
+    def __str__(self):
+        cents = int(self)
+        sign = "-" if cents < 0 else ""
+        return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+    def __repr__(self):
+        return f"Money('{self}')"
+
+    def __format__(self, format_spec):
+        if format_spec in ("", ".2f"):
+            return str(self)
+        return format(self.to_decimal(), format_spec)
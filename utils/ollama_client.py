@@ -0,0 +1,32 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+class OllamaError(Exception):
+    def __init__(self, status_code, detail):
+        super().__init__(f"Ollama call failed with status code {status_code}: {detail}")
+        self.status_code = status_code
+
+class OllamaClient:
+    # A minimal /api/generate client. The community Ollama LLM posts through requests.post, which opens a
+    # fresh connection per call; here every call reuses one keep-alive pool shared by all worker threads
+    def __init__(self, model, base_url="http://localhost:11434", timeout=60, pool_size=10):
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size), max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def invoke(self, prompt, stop=None, **options):
+        # options are Ollama model options such as num_predict; retries are ResilientModel's job
+        if stop:
+            options["stop"] = stop
+        payload = {"model": self.model, "prompt": prompt, "stream": False, "options": options}
+        response = self.session.post(f"{self.base_url}/api/generate", json=payload, timeout=self.timeout)
+        if response.status_code != 200:
+            raise OllamaError(response.status_code, response.text.strip())
+        return response.json()["response"]
+
+    def close(self):
+        self.session.close()
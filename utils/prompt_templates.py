@@ -0,0 +1,118 @@
+import difflib
+import re
+import zlib
+from utils.metrics import METRICS
+
+FALLBACK_LABEL = "Uncategorized"
+
+# The closed label set the model must answer from. The words matter: ProcessTransactionsTask posts
+# labels containing "Revenue" as revenue and "Expenses"/"Services" on outflows as payables
+DEFAULT_LABELS = (
+    "Revenue",
+    "Subscription Revenue",
+    "Professional Services",
+    "Operating Expenses",
+    "Hosting Expenses",
+    "Software Expenses",
+    "Office Expenses",
+    "Marketing Expenses",
+    "Travel Expenses",
+    "Meals Expenses",
+    "Payroll Expenses",
+    "Bank Fees",
+    "Taxes",
+    FALLBACK_LABEL,
+)
+
+# Nearest-label matches below this similarity ratio are treated as no match
+NEAREST_LABEL_CUTOFF = 0.6
+
+ANSWER_PREFIX = re.compile(r"^\s*(?:category|label|answer)\s*[:=\-]\s*", re.IGNORECASE)
+
+def parse_labels(value):
+    # CATEGORY_LABELS is comma-separated; empty means the default set
+    labels = [label.strip() for label in (value or "").split(",") if label.strip()]
+    if not labels:
+        return DEFAULT_LABELS
+    if FALLBACK_LABEL not in labels:
+        labels.append(FALLBACK_LABEL)
+    return tuple(labels)
+
+class PromptTemplate:
+    # The instructions and label list form a static prefix built once; only the transaction lines
+    # follow it, so providers with prompt caching reuse the prefix across every call
+    def __init__(self, name, preamble, labels=DEFAULT_LABELS, max_tokens=12, batch_item_tokens=14):
+        self.name = name
+        self.preamble = preamble
+        self.labels = tuple(labels)
+        self.max_tokens = max_tokens
+        self.batch_item_tokens = batch_item_tokens
+        allowed = f"Labels: {', '.join(self.labels)}\n"
+        self.prefix = f"{preamble}{allowed}Reply with one label only.\n"
+        self.batch_prefix = (
+            f"{preamble}{allowed}"
+            f"Lines are 'ID | description | amount'. Reply with one line of JSON mapping each ID to a label.\n"
+        )
+        # Part of the cache key, so changing the wording or the label set invalidates cached answers
+        self.version = f"{name}-{zlib.crc32((self.prefix + self.batch_prefix).encode()):08x}"
+        self._canonical = {label.lower(): label for label in self.labels}
+        self._longest_first = sorted(self._canonical, key=len, reverse=True)
+
+    def with_labels(self, labels):
+        if tuple(labels) == self.labels:
+            return self
+        return PromptTemplate(self.name, self.preamble, labels, self.max_tokens, self.batch_item_tokens)
+
+    def render(self, description, amount):
+        return f"{self.prefix}Description: '{description}' Amount: {amount}\nLabel:"
+
+    def render_batch(self, transactions):
+        lines = "\n".join(f"{item_id} | {description} | {amount}" for item_id, description, amount in transactions)
+        return f"{self.batch_prefix}{lines}\nJSON:"
+
+    def options(self, stop=True):
+        # A label is a few tokens on one line; stop there rather than pay for an explanation. A reply
+        # that opens with a newline is cut to nothing by the stop, so those are re-asked with stop=False
+        if not stop:
+            return {"max_tokens": self.max_tokens}
+        return {"max_tokens": self.max_tokens, "stop": ["\n"]}
+
+    def batch_options(self, count):
+        return {"max_tokens": self.batch_item_tokens * count + 8, "stop": ["\n\n"]}
+
+    def match_label(self, response):
+        # Maps a raw answer onto the closed set: exact, then a label named inside the answer,
+        # then the nearest label by spelling; anything else becomes the fallback label. An empty
+        # answer is no answer at all and returns None, so the row is deferred rather than posted
+        text = ANSWER_PREFIX.sub("", response.strip().split("\n")[0])
+        text = re.sub(r"[\"'`*]", "", text).strip(" .").lower()
+        if not text:
+            return None
+        label = self._canonical.get(text)
+        if label is not None:
+            return label
+        for candidate in self._longest_first:
+            if re.search(rf"\b{re.escape(candidate)}\b", text):
+                return self._correct(self._canonical[candidate], "contained")
+        nearest = difflib.get_close_matches(text, self._canonical, n=1, cutoff=NEAREST_LABEL_CUTOFF)
+        if nearest:
+            return self._correct(self._canonical[nearest[0]], "nearest")
+        return self._correct(FALLBACK_LABEL, "fallback")
+
+    def _correct(self, label, kind):
+        METRICS.inc("bookkeeper_label_corrections_total", 1, "Model answers mapped onto the closed label set",
+                    template=self.name, kind=kind)
+        return label
+
+PROCESS_TEMPLATE = PromptTemplate(
+    "process",
+    "Categorize SaaS startup bank transactions.\n"
+    "Stripe: Revenue. Invoices, payments from customers: Subscription Revenue. "
+    "Negative consulting, contractor, services: Professional Services. "
+    "Negative rent, subscription, domain, hosting, software: Operating Expenses.\n",
+)
+
+CATEGORIZE_TEMPLATE = PromptTemplate(
+    "categorize",
+    "Categorize SaaS company bank transactions.\n",
+)
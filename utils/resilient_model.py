@@ -0,0 +1,157 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.metrics import METRICS
+
+# Transport, timeout and provider-side failures worth retrying, matched by class name anywhere in the
+# error's hierarchy so no provider package has to be imported here: builtins and requests
+# (ConnectionError, Timeout, ...), httpx (TransportError) and openai (APIConnectionError, RateLimitError, ...)
+TRANSIENT_ERRORS = frozenset({
+    "ConnectionError", "TimeoutError", "Timeout", "ChunkedEncodingError", "TransportError",
+    "APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError",
+})
+# HTTP statuses a provider may answer with when it is overloaded or briefly down
+TRANSIENT_STATUS_CODES = frozenset({408, 409, 425, 429})
+
+def is_transient(error):
+    if any(cls.__name__ in TRANSIENT_ERRORS for cls in type(error).__mro__):
+        return True
+    status_code = getattr(error, "status_code", None)
+    return isinstance(status_code, int) and (status_code in TRANSIENT_STATUS_CODES or status_code >= 500)
+
+class ModelUnavailable(Exception):
+    # Raised instead of the provider error once retries are spent or the circuit is open;
+    # callers defer the affected rows rather than abort the run
+    pass
+
+class TokenBucket:
+    def __init__(self, requests_per_minute, burst=1, context=None):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, burst)
+        if context is not None:
+            # Given a multiprocessing context, tokens and the refill time live in shared memory, so the
+            # context's worker processes handed this bucket at start-up draw from one budget
+            self._state = context.Array('d', [float(self.capacity), time.monotonic()])
+            self._lock = self._state.get_lock()
+        else:
+            self._state = [float(self.capacity), time.monotonic()]
+            self._lock = threading.Lock()
+
+    @property
+    def tokens(self):
+        return self._state[0]
+
+    def acquire(self):
+        # Blocks until a request may go out; a rate of 0 means no limit
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens = min(self.capacity, self._state[0] + (now - self._state[1]) * self.rate)
+                self._state[1] = now
+                if tokens >= 1:
+                    self._state[0] = tokens - 1
+                    return
+                self._state[0] = tokens
+                wait = (1 - tokens) / self.rate
+            time.sleep(wait)
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Let probe requests through; the first result decides whether to close or reopen
+                self.state = self.HALF_OPEN
+            return self.state != self.OPEN
+
+    def available_in(self):
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    METRICS.inc("bookkeeper_llm_circuit_opened_total", 1, "Times the model circuit breaker opened")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+class ResilientModel:
+    # Wraps a model client with rate limiting, jittered exponential retries and a circuit breaker
+    def __init__(self, client, max_retries=3, backoff_base=0.5, backoff_max=30.0, rate_limiter=None, breaker=None, token_limit_key="max_tokens", retryable=is_transient):
+        self.client = client
+        # Only errors this accepts are retried and counted by the breaker; anything else, such as a
+        # TypeError from a bad call or a rejected API key, propagates unchanged
+        self.retryable = retryable
+        # Callers cap output with max_tokens; providers that name it differently get it renamed
+        self.token_limit_key = token_limit_key
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_limiter = rate_limiter or TokenBucket(0)
+        self.breaker = breaker or CircuitBreaker()
+
+    def invoke(self, prompt, **kwargs):
+        if "max_tokens" in kwargs and self.token_limit_key != "max_tokens":
+            kwargs[self.token_limit_key] = kwargs.pop("max_tokens")
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                raise ModelUnavailable("Model circuit is open; deferring request")
+            self.rate_limiter.acquire()
+            try:
+                response = self.client.invoke(prompt, **kwargs)
+            except Exception as error:
+                if not self.retryable(error):
+                    raise
+                self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    raise ModelUnavailable(f"Model request failed after {attempt + 1} attempt(s): {error}") from error
+                METRICS.inc("bookkeeper_llm_retries_total", 1, "Model requests retried after an error")
+                # Full jitter keeps concurrent workers from retrying in lockstep
+                time.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt)))
+            else:
+                self.breaker.record_success()
+                return response
+
+    def batch(self, prompts, config=None, return_exceptions=False, **kwargs):
+        # Each prompt goes through invoke so retries, limits and the breaker apply per request
+        max_concurrency = (config or {}).get("max_concurrency") or 1
+
+        def call(prompt):
+            try:
+                return self.invoke(prompt, **kwargs)
+            except Exception as error:
+                if not return_exceptions:
+                    raise
+                return error
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            return list(executor.map(call, prompts))
+
+    def available_in(self):
+        return self.breaker.available_in()
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.client, name)
@@ -0,0 +1,65 @@
+import json
+import os
+import re
+
+# Mirrors the hard rules spelled out in the ProcessTransactionsTask prompt, in priority order
+DEFAULT_RULES = [
+    {"category": "Revenue", "keywords": ["stripe"], "sign": "any"},
+    {"category": "Subscription Revenue", "keywords": ["invoice", "payment from customer"], "sign": "any"},
+    {"category": "Professional Services", "keywords": ["consulting", "contractor", "services"], "sign": "negative"},
+    {"category": "Operating Expenses", "keywords": ["rent", "subscription", "domain", "hosting", "software"], "sign": "negative"},
+]
+
+VALID_SIGNS = ("any", "positive", "negative")
+
+class RuleEngine:
+    def __init__(self, rules):
+        self.rules = []
+        for rule in rules:
+            sign = rule.get("sign", "any")
+            if sign not in VALID_SIGNS:
+                raise ValueError(f"Invalid sign '{sign}' in categorization rule for {rule.get('category')}")
+            if not rule.get("keywords"):
+                raise ValueError(f"Categorization rule for {rule.get('category')} has no keywords")
+            self.rules.append({"category": rule["category"], "keywords": rule["keywords"], "sign": sign})
+
+        # One pattern per amount sign, holding only the rules that can fire for it. Each rule is a
+        # named group inside a lookahead so every position is tried and overlapping keywords are all seen.
+        self._patterns = {
+            "positive": self._compile(("any", "positive")),
+            "negative": self._compile(("any", "negative")),
+        }
+
+    def match(self, description, amount):
+        pattern = self._patterns["negative" if float(amount) < 0 else "positive"]
+        if pattern is None:
+            return None
+        best = None
+        for match in pattern.finditer(description):
+            index = int(match.lastgroup[1:])
+            if best is None or index < best:
+                best = index
+                if best == 0:
+                    break
+        return self.rules[best]["category"] if best is not None else None
+
+    def _compile(self, signs):
+        groups = []
+        for index, rule in enumerate(self.rules):
+            if rule["sign"] not in signs:
+                continue
+            keywords = "|".join(re.escape(keyword.lower()) for keyword in rule["keywords"])
+            groups.append(f"(?P<r{index}>\\b(?:{keywords}))")
+        if not groups:
+            return None
+        return re.compile(f"(?=(?:{'|'.join(groups)}))", re.IGNORECASE)
+
+def load_rules(path=None):
+    # The built-in rules apply only when no file is configured; a configured file that is missing is
+    # an error, not a silent switch to rules nobody chose
+    if not path:
+        return RuleEngine(DEFAULT_RULES)
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Category rules file not found: {path} (set CATEGORY_RULES_PATH, or leave it empty for the built-in rules)")
+    with open(path, mode='r') as file:
+        return RuleEngine(json.load(file)["rules"])
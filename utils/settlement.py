@@ -0,0 +1,99 @@
+import csv
+import os
+from bisect import bisect_left
+from utils.aging_engine import parse_date_ordinal
+from utils.money import Money
+
+DEFAULT_DATE_WINDOW = 30
+
+# Per-item outcomes reported by a settlement run
+SETTLED = "settled"
+ALREADY_PAID = "already paid"
+DUPLICATE = "duplicate"
+NOT_FOUND = "not found"
+NO_MATCH = "no match"
+INVALID = "invalid"
+
+def load_remittance(path):
+    # A remittance or bank-statement CSV: rows carry either a transaction_id, or an amount and a date
+    if not os.path.isfile(path):
+        raise ValueError(f"Remittance file not found: {path}")
+    items = []
+    with open(path, mode='r', newline='') as file:
+        reader = csv.DictReader(file)
+        fieldnames = set(reader.fieldnames or [])
+        if 'transaction_id' not in fieldnames and not {'amount', 'date'} <= fieldnames:
+            raise ValueError("Remittance file needs a transaction_id column or amount and date columns")
+        for line_number, row in enumerate(reader, start=2):
+            items.append({
+                'line': line_number,
+                'transaction_id': (row.get('transaction_id') or '').strip(),
+                'amount': (row.get('amount') or '').strip(),
+                'date': (row.get('date') or '').strip(),
+                'reference': (row.get('reference') or row.get('description') or '').strip(),
+            })
+    return items
+
+class SettlementIndex:
+    def __init__(self, rows, date_window=DEFAULT_DATE_WINDOW):
+        # One pass over the ledger builds both indexes; every lookup afterwards is a dict probe
+        self.date_window = date_window
+        self.by_id = {}
+        self.by_amount = {}
+        for row in rows:
+            # Backends disagree on ID types (CSV text, SQLite integers), so index on the text form
+            transaction_id = str(row['transaction_id'])
+            self.by_id[transaction_id] = row
+            if row['payment_status'] != 'Paid':
+                self.by_amount.setdefault(row['amount'], []).append((parse_date_ordinal(row['due_date']), transaction_id))
+        for candidates in self.by_amount.values():
+            candidates.sort()
+        self.claimed = set()
+
+    def match(self, items):
+        # Returns (item, status, row) per item; each unpaid transaction settles at most once
+        results = []
+        for item in items:
+            if item.get('transaction_id'):
+                results.append(self._match_id(item))
+            else:
+                results.append(self._match_amount(item))
+        return results
+
+    def settled_ids(self, results):
+        return [row['transaction_id'] for _, status, row in results if status == SETTLED]
+
+    def _match_id(self, item):
+        row = self.by_id.get(str(item['transaction_id']))
+        if row is None:
+            return item, NOT_FOUND, None
+        if row['payment_status'] == 'Paid':
+            return item, ALREADY_PAID, row
+        transaction_id = str(row['transaction_id'])
+        if transaction_id in self.claimed:
+            return item, DUPLICATE, row
+        self.claimed.add(transaction_id)
+        return item, SETTLED, row
+
+    def _match_amount(self, item):
+        try:
+            amount = Money.parse(item['amount'])
+            paid_on = parse_date_ordinal(item['date'])
+        except ValueError:
+            return item, INVALID, None
+        candidates = self.by_amount.get(amount, [])
+        low = bisect_left(candidates, (paid_on - self.date_window,))
+        high = bisect_left(candidates, (paid_on + self.date_window + 1,))
+        # Closest due date wins; on a tie the earlier due date settles first
+        best = None
+        for position in range(low, high):
+            due_on, transaction_id = candidates[position]
+            if transaction_id in self.claimed:
+                continue
+            distance = abs(due_on - paid_on)
+            if best is None or distance < best[0]:
+                best = (distance, transaction_id)
+        if best is None:
+            return item, NO_MATCH, None
+        self.claimed.add(best[1])
+        return item, SETTLED, self.by_id[best[1]]
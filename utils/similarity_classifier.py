@@ -0,0 +1,225 @@
+import argparse
+import json
+import math
+import os
+import threading
+import zlib
+from array import array
+from collections import Counter
+from storage.checkpoint import write_json_durably
+from utils.categorization_cache import normalize_description
+from utils.prompt_templates import FALLBACK_LABEL
+
+HASH_BITS = 20
+NGRAM_SIZES = (3, 4)
+# n-grams found in more than this share of descriptions carry almost no signal and have the longest postings
+MAX_DOCUMENT_FREQUENCY = 0.5
+# Document weights use the IDF of the last full build; reweigh once the index has grown this much since
+REWEIGH_GROWTH = 0.25
+
+def description_features(text):
+    # Hashed character n-grams of the normalized description, with counts
+    padded = f" {text} "
+    mask = (1 << HASH_BITS) - 1
+    return Counter(
+        zlib.crc32(padded[start:start + size].encode()) & mask
+        for size in NGRAM_SIZES
+        for start in range(len(padded) - size + 1)
+    )
+
+def learnable(row):
+    # The fallback label says the model found no category, so it is never history worth matching
+    return bool(row.get('category')) and row['category'] != FALLBACK_LABEL
+
+class SimilarityClassifier:
+    # Nearest-neighbour categorization over the ledger's own history: one document per distinct
+    # (sign, normalized description), holding a vote count per category that rows confirmed
+    def __init__(self, path="example/similarity_index.json", threshold=0.8, history=None):
+        self.path = path
+        self.threshold = threshold
+        self._history = history
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+        self._documents = {}
+        self._signs = bytearray()
+        self._texts = []
+        self._votes = []
+        self._features = []
+        self._document_frequency = Counter()
+        self._postings = {}
+        self._weighted_count = 0
+
+    def classify(self, description, amount):
+        # Returns the neighbour's category when the match is confident enough, else None
+        with self._lock:
+            self._ensure_loaded()
+            if not self._texts:
+                return None
+            sign = 1 if float(amount) < 0 else 0
+            text = normalize_description(description)
+            document = self._documents.get((sign, text))
+            if document is not None:
+                category, share = self._top_category(document)
+                return category if share >= self.threshold and category != FALLBACK_LABEL else None
+
+            if len(self._texts) > self._weighted_count * (1 + REWEIGH_GROWTH):
+                self._reweigh()
+            query = self._vector(description_features(text), skip_common=True)
+            scores = {}
+            for feature, weight in query.items():
+                documents, weights = self._postings.get(feature, ((), ()))
+                for position, candidate in enumerate(documents):
+                    if self._signs[candidate] == sign:
+                        scores[candidate] = scores.get(candidate, 0.0) + weight * weights[position]
+            if not scores:
+                return None
+            best = max(scores, key=scores.get)
+            category, share = self._top_category(best)
+            # An index built before the fallback label was filtered out may still hold its votes
+            return category if scores[best] * share >= self.threshold and category != FALLBACK_LABEL else None
+
+    def add(self, rows):
+        # Learns from rows that now carry a confirmed category
+        with self._lock:
+            self._ensure_loaded()
+            for row in rows:
+                self._learn(row)
+            self._dirty = True
+
+    def rebuild(self, rows):
+        with self._lock:
+            self._reset()
+            self._loaded = True
+            for row in rows:
+                self._learn(row)
+            self._reweigh()
+            self._dirty = True
+
+    def stats(self):
+        with self._lock:
+            self._ensure_loaded()
+            return {
+                "documents": len(self._texts),
+                "rows": sum(sum(votes.values()) for votes in self._votes),
+                "features": len(self._document_frequency),
+                "threshold": self.threshold,
+            }
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            # Vectors are cheap to recompute, so only the documents and their votes are stored
+            data = {"version": 1, "documents": [[sign, text, votes] for sign, text, votes in zip(self._signs, self._texts, self._votes)]}
+            write_json_durably(self.path, data)
+            self._dirty = False
+
+    def _ensure_loaded(self):
+        # Deferred to first use so commands that never categorize don't pay for it
+        if self._loaded:
+            return
+        self._loaded = True
+        if os.path.isfile(self.path):
+            with open(self.path, mode='r') as file:
+                data = json.load(file)
+            for sign, text, votes in data.get("documents", []):
+                self._add(sign, text, votes)
+        elif self._history is not None:
+            # First run against an existing ledger: seed the index from everything already processed
+            for row in self._history():
+                self._learn(row)
+            self._dirty = bool(self._texts)
+        self._reweigh()
+
+    def _reset(self):
+        self._documents.clear()
+        self._signs = bytearray()
+        self._texts = []
+        self._votes = []
+        self._features = []
+        self._document_frequency = Counter()
+        self._postings = {}
+        self._weighted_count = 0
+
+    def _learn(self, row):
+        if learnable(row):
+            sign = 1 if float(row['amount']) < 0 else 0
+            self._add(sign, normalize_description(row['description']), {row['category']: 1})
+
+    def _add(self, sign, text, votes):
+        document = self._documents.get((sign, text))
+        if document is not None:
+            for category, count in votes.items():
+                self._votes[document][category] = self._votes[document].get(category, 0) + count
+            return
+        document = self._documents[(sign, text)] = len(self._texts)
+        features = description_features(text)
+        self._signs.append(sign)
+        self._texts.append(text)
+        self._votes.append(dict(votes))
+        self._features.append(features)
+        self._document_frequency.update(features.keys())
+        if self._weighted_count:
+            # Until the next reweigh, new documents are indexed against the current IDF
+            self._post(document, features)
+
+    def _reweigh(self):
+        self._postings = {}
+        for document, features in enumerate(self._features):
+            self._post(document, features)
+        self._weighted_count = len(self._texts)
+
+    def _post(self, document, features):
+        for feature, weight in self._vector(features).items():
+            postings = self._postings.get(feature)
+            if postings is None:
+                postings = self._postings[feature] = (array('I'), array('f'))
+            postings[0].append(document)
+            postings[1].append(weight)
+
+    def _vector(self, features, skip_common=False):
+        total = max(1, len(self._texts))
+        vector = {}
+        for feature, count in features.items():
+            frequency = self._document_frequency.get(feature, 0)
+            if skip_common and frequency > total * MAX_DOCUMENT_FREQUENCY:
+                continue
+            vector[feature] = (1 + math.log(count)) * (math.log((1 + total) / (1 + frequency)) + 1)
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        return {feature: weight / norm for feature, weight in vector.items()}
+
+    def _top_category(self, document):
+        votes = self._votes[document]
+        category = max(votes, key=votes.get)
+        return category, votes[category] / sum(votes.values())
+
+def load_classifier(config, storage=None):
+    if not config["SIMILARITY_INDEX_PATH"]:
+        return None
+    history = storage.iter_processed if storage is not None else None
+    return SimilarityClassifier(config["SIMILARITY_INDEX_PATH"], config["SIMILARITY_THRESHOLD"], history)
+
+def main():
+    from utils.env_loader import load_env
+    from utils.storage_loader import load_storage
+
+    parser = argparse.ArgumentParser(description="Inspect or rebuild the ledger-history similarity index.")
+    parser.add_argument("command", choices=["stats", "rebuild"])
+    args = parser.parse_args()
+
+    config = load_env()
+    if not config["SIMILARITY_INDEX_PATH"]:
+        print("The similarity classifier is disabled (SIMILARITY_INDEX_PATH is empty).")
+        return
+    storage = load_storage(config)
+    classifier = load_classifier(config, storage)
+    if args.command == "rebuild":
+        classifier.rebuild(storage.iter_processed())
+        classifier.save()
+    for name, value in classifier.stats().items():
+        print(f"{name}: {value}")
+    storage.close()
+
+if __name__ == "__main__":
+    main()
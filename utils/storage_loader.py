@@ -0,0 +1,13 @@
+from storage.csv_storage import CsvLedgerStorage
+
+def load_storage(config):
+    if config["LEDGER_BACKEND"] == "csv":
+        return CsvLedgerStorage(config["RAW_CSV"], config["PROCESSED_CSV"], config["SUMMARY_CSV"])
+    elif config["LEDGER_BACKEND"] == "sqlite":
+        from storage.sqlite_storage import SqliteLedgerStorage
+        return SqliteLedgerStorage(config["LEDGER_DB_PATH"])
+    elif config["LEDGER_BACKEND"] == "partitioned":
+        from storage.partitioned_storage import PartitionedLedgerStorage
+        return PartitionedLedgerStorage(config["RAW_CSV"], config["LEDGER_PARTITION_DIR"], config["SUMMARY_CSV"])
+    else:
+        raise ValueError("Unsupported LEDGER_BACKEND")